@@ -0,0 +1,139 @@
+import asyncio
+import gzip
+import logging
+import os
+import re
+import shutil
+from datetime import datetime
+from typing import Optional
+from playwright.async_api import Page
+from src.config import load_config_section
+from src.constants import ARTIFACTS_DIR_PATH, DEFAULT_ACCOUNT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARTIFACTS = {
+    "enabled": True,
+    "dir": ARTIFACTS_DIR_PATH,
+    # Viewport-only JPEG; the DOM snapshot alone is usually enough to debug a selector
+    "screenshot": False,
+    "screenshot_quality": 40,
+    "run_budget_kb": 2048,
+    "max_runs": 20,
+}
+
+
+class ArtifactCollector:
+    """
+    Saves what the page looked like when something failed.
+
+    Each capture writes a gzipped DOM snapshot, plus an optional low-quality
+    viewport screenshot, to data/artifacts/<account>/<run>/. Compression and
+    disk writes run in a worker thread so the event loop only waits for the
+    page itself. A run stops capturing once it has written run_budget_kb, and
+    only the newest max_runs run directories are kept per account.
+    """
+
+    def __init__(
+        self,
+        account: str = DEFAULT_ACCOUNT,
+        directory: str = ARTIFACTS_DIR_PATH,
+        enabled: bool = True,
+        screenshot: bool = False,
+        screenshot_quality: int = 40,
+        run_budget_kb: int = 2048,
+        max_runs: int = 20,
+    ):
+        self.account = account
+        self.account_dir = os.path.join(directory, account)
+        self.run_dir = os.path.join(
+            self.account_dir, datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        )
+        self.enabled = enabled
+        self.screenshot = screenshot
+        self.screenshot_quality = screenshot_quality
+        self.budget_bytes = run_budget_kb * 1024
+        self.max_runs = max_runs
+        self.used_bytes = 0
+        self.captures = 0
+        self._rotated = False
+
+    @classmethod
+    def from_config(cls, account: str = DEFAULT_ACCOUNT) -> "ArtifactCollector":
+        config = load_config_section("artifacts", DEFAULT_ARTIFACTS)
+        return cls(
+            account,
+            directory=config["dir"],
+            enabled=config["enabled"],
+            screenshot=config["screenshot"],
+            screenshot_quality=config["screenshot_quality"],
+            run_budget_kb=config["run_budget_kb"],
+            max_runs=config["max_runs"],
+        )
+
+    async def capture(self, page: Optional[Page], label: str) -> Optional[str]:
+        """
+        Captures the page for the failure `label`. Returns the snapshot path, or
+        None if nothing was written. Never raises: a failed capture must not
+        hide the error being reported.
+        """
+        if not self.enabled or page is None:
+            return None
+        if self.used_bytes >= self.budget_bytes:
+            logger.debug("Artifact budget exhausted, not capturing '%s'", label)
+            return None
+
+        self.captures += 1
+        name = f"{self.captures:03d}-{_slug(label)}"
+        try:
+            html = await page.content()
+            path = await asyncio.to_thread(self._write_snapshot, f"{name}.html.gz", html)
+            if path and self.screenshot:
+                image = await page.screenshot(
+                    type="jpeg", quality=self.screenshot_quality, full_page=False
+                )
+                await asyncio.to_thread(self._write, f"{name}.jpg", image)
+        except Exception as e:
+            logger.warning("Could not capture failure artifact '%s': %s", label, e)
+            return None
+
+        if path:
+            logger.info("Saved failure artifact to %s", path)
+        return path
+
+    def _write_snapshot(self, filename: str, html: str) -> Optional[str]:
+        return self._write(filename, gzip.compress(html.encode(), 6))
+
+    def _write(self, filename: str, data: bytes) -> Optional[str]:
+        if self.used_bytes + len(data) > self.budget_bytes:
+            logger.warning(
+                "Skipping artifact %s: run budget of %d KB reached",
+                filename,
+                self.budget_bytes // 1024,
+            )
+            return None
+
+        os.makedirs(self.run_dir, exist_ok=True)
+        if not self._rotated:
+            self._rotate()
+            self._rotated = True
+
+        path = os.path.join(self.run_dir, filename)
+        with open(path, "wb") as f:
+            f.write(data)
+        self.used_bytes += len(data)
+        return path
+
+    def _rotate(self):
+        """Deletes the oldest run directories beyond max_runs, this run included."""
+        runs = sorted(
+            entry
+            for entry in os.listdir(self.account_dir)
+            if os.path.isdir(os.path.join(self.account_dir, entry))
+        )
+        for entry in runs[: max(len(runs) - max(self.max_runs, 1), 0)]:
+            shutil.rmtree(os.path.join(self.account_dir, entry), ignore_errors=True)
+
+
+def _slug(label: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", label).strip("-") or "failure"
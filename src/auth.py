@@ -1,6 +1,7 @@
-import os
 import getpass
 import asyncio
+import logging
+from typing import Optional
 from playwright.async_api import async_playwright, Page, BrowserContext
 from src.constants import (
     URL_DASHBOARD,
@@ -10,55 +11,97 @@ from src.constants import (
     SELECTOR_SUBMIT,
     SELECTOR_2FA_INPUT,
     AUTH_FILE_PATH,
+    DEFAULT_ACCOUNT,
 )
+from src.artifacts import ArtifactCollector
+from src.browser import LaunchProfile, launch_browser, load_launch_profile, new_context
+from src.har import HAR_REPLAY, route_from_har
 from src.navigator import Navigator
+from src.session_store import SessionStore, StorageState
+
+logger = logging.getLogger(__name__)
 
 
 class Authenticator:
-    def __init__(self, force_login: bool = False):
+    def __init__(
+        self,
+        force_login: bool = False,
+        account: str = DEFAULT_ACCOUNT,
+        store: Optional[SessionStore] = None,
+        har_mode: Optional[str] = None,
+        profile: Optional[LaunchProfile] = None,
+        artifacts: Optional[ArtifactCollector] = None,
+    ):
         self.force_login = force_login
+        self.account = account
+        self.store = store or SessionStore()
+        self.har_mode = har_mode
+        self.profile = profile or load_launch_profile()
+        self.artifacts = artifacts or ArtifactCollector.from_config(account)
         self.auth_file = AUTH_FILE_PATH
 
-    async def authenticate(self) -> str:
+    def _load_session(self) -> Optional[StorageState]:
+        state = self.store.load(self.account)
+        if state is None and self.account == DEFAULT_ACCOUNT:
+            # Carry over the session saved by single-account versions of the bot
+            state = self.store.import_file(self.account, self.auth_file)
+            if state is not None:
+                logger.info("Imported legacy session from %s", self.auth_file)
+        return state
+
+    async def authenticate(self) -> StorageState:
+        # Overlapping runs for the same account wait here instead of racing to refresh
+        async with self.store.lock(self.account):
+            await self._validate_or_login()
+        return self.store.load(self.account)
+
+    async def _validate_or_login(self):
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
+            browser, _ = await launch_browser(p, self.profile)
 
-            # Check if auth file exists and try to use it
+            # Check if a stored session exists and try to use it
             context = None
-            if os.path.exists(self.auth_file) and not self.force_login:
-                print("Loading session from file...")
-                context = await browser.new_context(storage_state=self.auth_file)
+            state = self._load_session()
+            if state is not None and not self.force_login:
+                logger.info("Loading session for account '%s'...", self.account)
+                context = await new_context(browser, self.profile, storage_state=state)
             else:
-                context = await browser.new_context()
+                context = await new_context(browser, self.profile)
+            await route_from_har(context, self.har_mode, self.account, "auth")
 
             page = await context.new_page()
             nav = Navigator(page)
 
-            print("Validating session...")
+            logger.info("Validating session...")
             try:
                 await nav.goto(URL_DASHBOARD)
             except Exception as e:
-                print(f"Navigation failed: {e}")
+                logger.warning("Navigation failed: %s", e)
+                await self.artifacts.capture(page, "session-validation")
                 # If navigation fails, we might need login
 
             final_url = page.url
-            if URL_LOGIN in final_url or self.force_login:
-                print("Session invalid or forced login. Starting interactive login...")
+            if self.har_mode == HAR_REPLAY:
+                # Replayed cookies are stale, so they must never reach the store
+                if URL_LOGIN in final_url:
+                    await self.artifacts.capture(page, "session-validation")
+                await context.close()
+                await browser.close()
+                if URL_LOGIN in final_url:
+                    raise RuntimeError("Recorded session is not valid. Record again.")
+                logger.info("Session valid (replayed).")
+            elif URL_LOGIN in final_url or self.force_login:
+                logger.info("Session invalid or forced login. Starting interactive login...")
                 await context.close()
                 await browser.close()
                 await self._interactive_login()
             else:
-                # If the session is valid but the auth file doesn't exist, save it.
-                if not os.path.exists(self.auth_file):
-                    print("Session is valid, saving new session state...")
-                    await context.storage_state(path=self.auth_file)
-                else:
-                    print("Session valid.")
+                # Save the validated state so rotated cookies and expiry stay current
+                logger.info("Session valid.")
+                self.store.save(self.account, await context.storage_state())
                 await context.close()
                 await browser.close()
 
-        return self.auth_file
-
     async def _interactive_login(self):
         # Interactive login requires tty, so we might need headless=False if running locally
         # But instructions say: "Si la sesión es inválida, lanzar navegador (headless=True)."
@@ -69,10 +112,11 @@ class Authenticator:
 
         async with async_playwright() as p:
             # Re-launch browser for login flow
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context()
+            browser, _ = await launch_browser(p, self.profile)
+            context = await new_context(browser, self.profile)
             page = await context.new_page()
             nav = Navigator(page)
+            await nav.throttle_writes()
 
             await nav.goto(URL_LOGIN)
             await nav.fill_input(SELECTOR_EMAIL, email)
@@ -80,31 +124,27 @@ class Authenticator:
             await nav.safe_click(SELECTOR_SUBMIT)
 
             # 2FA Step
-            print("Waiting for page to load after credential submission...")
+            logger.info("Waiting for page to load after credential submission...")
             try:
                 # Wait for navigation to complete after submitting credentials
                 await page.wait_for_load_state("networkidle", timeout=15000)
 
-                print("Waiting for 2FA input field...")
+                logger.info("Waiting for 2FA input field...")
                 await page.wait_for_selector(SELECTOR_2FA_INPUT, timeout=10000)
                 code = input("🔐 Introduce el código 2FA de tu app: ")
                 await nav.fill_input(SELECTOR_2FA_INPUT, code)
                 await nav.safe_click(SELECTOR_SUBMIT)
                 # Let's wait for navigation to dashboard
-                print("Waiting for navigation to dashboard...")
+                logger.info("Waiting for navigation to dashboard...")
                 await page.wait_for_url("**/dashboard", timeout=60000)
-                print("Login successful!")
+                logger.info("Login successful!")
 
                 # Save storage state
-                await context.storage_state(path=self.auth_file)
+                self.store.save(self.account, await context.storage_state())
 
             except Exception as e:
-                print(f"Login failed or timeout: {e}")
-                screenshot_path = os.path.join(
-                    os.path.dirname(self.auth_file), "login_failure.png"
-                )
-                print(f"Saving screenshot to {screenshot_path}")
-                await page.screenshot(path=screenshot_path)
+                logger.error("Login failed or timeout: %s", e)
+                await self.artifacts.capture(page, "login")
                 raise e
             finally:
                 await context.close()
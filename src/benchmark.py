@@ -0,0 +1,249 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from playwright.async_api import Playwright, async_playwright
+from src.artifacts import ArtifactCollector
+from src.auth import Authenticator
+from src.bot import FactorialBot
+from src.browser import (
+    ENGINES,
+    LaunchProfile,
+    PeakMemorySampler,
+    launch_browser,
+    load_launch_profile,
+    new_context,
+    process_tree_rss_bytes,
+)
+from src.constants import BENCHMARK_REPORT_PATH, DEFAULT_ACCOUNT
+from src.har import HAR_REPLAY, load_recorded_date, route_from_har
+from src.logging_config import (
+    account_context,
+    add_logging_arguments,
+    setup_logging_from_args,
+)
+from src.metrics import RunMetrics
+from src.rate_limiter import RateLimiter
+from src.selector_registry import SelectorRegistry
+from src.session_store import StorageState
+
+logger = logging.getLogger(__name__)
+
+
+async def benchmark_engine(
+    playwright: Playwright,
+    profile: LaunchProfile,
+    storage_state: StorageState,
+    account: str = DEFAULT_ACCOUNT,
+    today: Optional[datetime] = None,
+    replay: bool = False,
+) -> Dict[str, Any]:
+    """
+    Runs the dry-run bot flow once on the profile's engine.
+
+    Returns the launch time, the duration of each bot phase and the peak
+    resident memory of the browser processes above what was running before
+    the launch. A failed launch or run is reported in "error".
+
+    Every run starts cold: it gets its own selector cache and rate limiter,
+    so an earlier engine's cache hits and token bucket do not skew the next
+    one. Failure artifacts are not kept, so benchmark runs never rotate out
+    the account's real ones.
+    """
+    result: Dict[str, Any] = {"engine": profile.engine, "success": False}
+    metrics = RunMetrics(account)
+    baseline = process_tree_rss_bytes()
+
+    async with PeakMemorySampler() as sampler:
+        try:
+            browser, result["launch_seconds"] = await launch_browser(playwright, profile)
+        except Exception as e:
+            logger.error("Could not launch %s: %s", profile.engine, e)
+            result["error"] = str(e)
+            return result
+
+        try:
+            context = await new_context(browser, profile, storage_state=storage_state)
+            if replay:
+                await route_from_har(context, HAR_REPLAY, account, "bot")
+            page = await context.new_page()
+            with tempfile.TemporaryDirectory(prefix="benchmark-") as scratch:
+                bot = FactorialBot(
+                    page,
+                    dry_run=True,
+                    selectors=SelectorRegistry(
+                        cache_path=os.path.join(scratch, "selector_cache.json")
+                    ),
+                    account=account,
+                    offline=replay,
+                    metrics=metrics,
+                    artifacts=ArtifactCollector(account, enabled=False),
+                    # Replays never reach the tenant; live runs keep its pacing
+                    limiter=(
+                        RateLimiter.unthrottled(profile.engine)
+                        if replay
+                        else RateLimiter.from_config()
+                    ),
+                )
+                await bot.run(today=today)
+            result["success"] = True
+        except Exception as e:
+            logger.error("Benchmark run on %s failed: %s", profile.engine, e)
+            result["error"] = str(e)
+        finally:
+            await browser.close()
+
+    result["phases"] = dict(metrics.phases)
+    result["navigations"] = metrics.values.get("navigations", 0)
+    if baseline is not None and sampler.peak is not None:
+        result["peak_rss_bytes"] = sampler.peak - baseline
+    return result
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Medians over the successful runs of one engine."""
+    ok = [run for run in runs if run["success"]]
+    summary: Dict[str, Any] = {
+        "engine": runs[0]["engine"],
+        "runs": len(runs),
+        "failures": len(runs) - len(ok),
+    }
+    if not ok:
+        summary["error"] = runs[-1].get("error")
+        return summary
+
+    summary["launch_seconds"] = statistics.median(run["launch_seconds"] for run in ok)
+    phases = {phase for run in ok for phase in run["phases"]}
+    summary["phases"] = {
+        phase: statistics.median(run["phases"].get(phase, 0) for run in ok)
+        for phase in sorted(phases)
+    }
+    peaks = [run["peak_rss_bytes"] for run in ok if "peak_rss_bytes" in run]
+    if peaks:
+        summary["peak_rss_bytes"] = statistics.median(peaks)
+    return summary
+
+
+def format_table(summaries: List[Dict[str, Any]]) -> str:
+    lines = [
+        f"{'engine':<24} {'launch s':>9} {'absences s':>11} {'attendance s':>13} {'peak MiB':>9}"
+    ]
+    for summary in summaries:
+        if "launch_seconds" not in summary:
+            lines.append(f"{summary['engine']:<24} failed: {summary.get('error')}")
+            continue
+        phases = summary["phases"]
+        peak = summary.get("peak_rss_bytes")
+        lines.append(
+            f"{summary['engine']:<24} {summary['launch_seconds']:>9.2f}"
+            f" {phases.get('absences', 0):>11.2f} {phases.get('attendance', 0):>13.2f}"
+            f" {peak / 2**20 if peak is not None else float('nan'):>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def write_report(summaries: List[Dict[str, Any]], path: str = BENCHMARK_REPORT_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(
+            {"generated_at": datetime.now().isoformat(), "engines": summaries},
+            f,
+            indent=2,
+        )
+    os.replace(tmp_path, path)
+
+
+async def main_async():
+    parser = argparse.ArgumentParser(
+        description="Compare browser engines on the same dry-run flow"
+    )
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=list(ENGINES),
+        default=list(ENGINES),
+        help="Engines to compare (default: all)",
+    )
+    parser.add_argument(
+        "--profile", help="Launch profile applied to every engine (default: [browser] profile)"
+    )
+    parser.add_argument(
+        "--account",
+        default=DEFAULT_ACCOUNT,
+        help="Account whose stored session is used (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Run every engine against the last recorded HAR instead of the live site",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=1, help="Runs per engine; medians are reported"
+    )
+    parser.add_argument(
+        "--output",
+        default=BENCHMARK_REPORT_PATH,
+        help="JSON report path (default: %(default)s)",
+    )
+    add_logging_arguments(parser)
+
+    args = parser.parse_args()
+
+    setup_logging_from_args(args)
+    account_context.set(args.account)
+
+    today = datetime.now()
+    try:
+        if args.replay:
+            today = load_recorded_date(args.account)
+        base_profile = load_launch_profile(args.profile)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error("%s", e)
+        sys.exit(1)
+
+    # Authenticate once so every engine starts from the same session
+    try:
+        storage_state = await Authenticator(
+            account=args.account,
+            har_mode=HAR_REPLAY if args.replay else None,
+            profile=base_profile,
+        ).authenticate()
+    except Exception as e:
+        logger.error("Authentication failed: %s", e)
+        sys.exit(1)
+
+    summaries = []
+    async with async_playwright() as p:
+        for engine in args.engines:
+            profile = load_launch_profile(base_profile.name, engine=engine)
+            runs = []
+            for run in range(args.runs):
+                logger.info("Benchmarking %s (run %d/%d)", engine, run + 1, args.runs)
+                runs.append(
+                    await benchmark_engine(
+                        p,
+                        profile,
+                        storage_state,
+                        account=args.account,
+                        today=today,
+                        replay=args.replay,
+                    )
+                )
+            summaries.append(summarize(runs))
+
+    logger.info("Benchmark results:\n%s", format_table(summaries))
+    write_report(summaries, args.output)
+    logger.info("Benchmark report written to %s", args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
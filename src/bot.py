@@ -1,11 +1,20 @@
 import asyncio
-import tomllib
+import logging
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Set, List
+from typing import Dict, Optional, List
 from playwright.async_api import Page
+from src.artifacts import ArtifactCollector
+from src.logging_config import date_context
+from src.metrics import RunMetrics
 from src.navigator import Navigator
+from src.rate_limiter import RateLimiter
+from src.selector_registry import SelectorRegistry
+from src.reconciliation import ReconciliationReport, parse_month_totals, shift_minutes
+from src.schedule import Schedule, Shift, get_schedule
 from src.constants import *
 
+logger = logging.getLogger(__name__)
+
 # e.g., {"2025-05-08": {"type": "full", "reason": "sick_leave"}}
 AbsenceInfo = Dict[str, str]
 Absences = Dict[str, AbsenceInfo]
@@ -27,52 +36,95 @@ SPANISH_MONTHS = {
 
 
 class FactorialBot:
-    schedule_config: Dict[str, List[str]]
-
-    def __init__(self, page: Page, dry_run: bool = False):
+    def __init__(
+        self,
+        page: Page,
+        dry_run: bool = False,
+        selectors: Optional[SelectorRegistry] = None,
+        account: str = DEFAULT_ACCOUNT,
+        offline: bool = False,
+        metrics: Optional[RunMetrics] = None,
+        artifacts: Optional[ArtifactCollector] = None,
+        schedule: Optional[Schedule] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
         self.page = page
-        self.nav = Navigator(page)
+        self.metrics = metrics or RunMetrics(account)
+        self.artifacts = artifacts or ArtifactCollector.from_config(account)
+        self.nav = Navigator(page, limiter=limiter, metrics=self.metrics)
         self.dry_run = dry_run
-        self.schedule_config = self._load_schedule_config()
-
-    def _load_schedule_config(self) -> Dict[str, List[str]]:
-        try:
-            with open("config.toml", "rb") as f:
-                config = tomllib.load(f)
-            return config["schedule"]
-        except (FileNotFoundError, KeyError, tomllib.TOMLDecodeError) as e:
-            print(
-                f"Warning: Could not load or parse config.toml ({e}). Falling back to default schedule."
-            )
-            return {
-                "normal_day_morning": ["08:30", "14:00"],
-                "normal_day_afternoon": ["15:00", "18:00"],
-                "friday_continuous": ["08:30", "15:00"],
-            }
-
-    async def run(self):
-        today = datetime.now()
+        self.account = account
+        self.offline = offline
+        self.selectors = selectors or SelectorRegistry()
+        # Compiled once per process and shared read-only by every bot
+        self.schedule = schedule or get_schedule(account)
+
+    async def run(self, today: Optional[datetime] = None):
+        today = today or datetime.now()
         end_date = today - timedelta(days=1)
         start_date = today - timedelta(days=30)
 
-        print(f"Processing range: {start_date.date()} to {end_date.date()}")
-
-        absences = await self.detect_absences(start_date, end_date)
+        logger.info("Processing range: %s to %s", start_date.date(), end_date.date())
+
+        if not self.offline:
+            # Throttled writes are fetched directly, which would bypass a replayed HAR
+            await self.nav.throttle_writes()
+
+        with self.metrics.phase("absences"):
+            absences = await self.detect_absences(start_date, end_date)
+        self.metrics.set("absences_detected", len(absences))
+        self._add_configured_holidays(absences, start_date, end_date)
+
+        with self.metrics.phase("attendance"):
+            report = await self.process_attendance(start_date, end_date, absences)
+
+        # A replay must never replace the live account's report
+        if not self.dry_run and not self.offline:
+            report_path = RECONCILIATION_REPORT_PATH.format(account=self.account)
+            report.write(report_path)
+            attention = report.needing_attention()
+            logger.info(
+                "Reconciliation: %d day(s) need attention. Report saved to %s",
+                len(attention),
+                report_path,
+            )
+            for entry in attention:
+                logger.warning(
+                    "Reconciliation: %s needs %s (%s)",
+                    entry["date"],
+                    entry["status"],
+                    entry["reason"],
+                )
 
-        await self.process_attendance(start_date, end_date, absences)
+    def _add_configured_holidays(
+        self, absences: Absences, start_date: datetime, end_date: datetime
+    ):
+        """Holidays from config.toml count as full-day absences."""
+        current_date = start_date
+        while current_date <= end_date:
+            if self.schedule.is_holiday(current_date):
+                absences.setdefault(
+                    current_date.strftime("%Y-%m-%d"),
+                    {"type": "full", "reason": "holiday"},
+                )
+            current_date += timedelta(days=1)
 
     async def detect_absences(
         self, start_date: datetime, end_date: datetime
     ) -> Absences:
-        print("Detecting absences...")
+        logger.info("Detecting absences...")
         await self.nav.goto(URL_TIMEOFF)
 
         try:
-            await self.page.wait_for_selector("ul.htyto0", timeout=10000)
+            await self.nav.resolve(self.selectors, "timeoff_calendar", timeout=10000)
+            month_name_selector = await self.nav.resolve(
+                self.selectors, "timeoff_month_name"
+            )
         except Exception:
-            print(
+            logger.warning(
                 "Could not find calendar container on page. Aborting absence detection."
             )
+            await self.artifacts.capture(self.page, "timeoff-calendar")
             return {}
 
         absences: Absences = {}
@@ -87,13 +139,14 @@ class FactorialBot:
             month_name = month_names.get(date_to_check.month)
             day_str = str(date_to_check.day)
             date_key = date_to_check.strftime("%Y-%m-%d")
+            date_context.set(date_key)
 
             if not month_name:
                 continue
 
             try:
                 month_name_element = self.page.locator(
-                    f"{SELECTOR_TIMEOFF_MONTH_NAME}:text('{month_name}')"
+                    f"{month_name_selector}:text('{month_name}')"
                 )
                 if await month_name_element.count() == 0:
                     continue
@@ -118,26 +171,29 @@ class FactorialBot:
                 elif COLOR_OTRO in style:
                     reason = "other"
 
-                if not reason:
-                    day_class = (await day_cell.first.get_attribute("class")) or ""
-                    if "htytoi" in day_class:
-                        reason = "holiday"
+                if not reason and await month_container.locator(
+                    f"{SELECTOR_TIMEOFF_HOLIDAY_CELL}:text-matches('^{day_str}$')"
+                ).count():
+                    reason = "holiday"
 
                 if reason:
                     if reason == "holiday":
-                        print(f"Absence detected on {date_key} (Reason: holiday)")
+                        logger.info("Absence detected on %s (Reason: holiday)", date_key)
                         absences[date_key] = {"type": "full", "reason": "holiday"}
                         continue
 
-                    print(f"Absence detected on {date_key} (Reason: {reason})")
+                    logger.info("Absence detected on %s (Reason: %s)", date_key, reason)
                     await day_cell.first.click()
 
                     absence_type = "full"
                     try:
-                        modal_body_locator = self.page.locator(
-                            SELECTOR_TIMEOFF_MODAL_BODY
+                        modal_body_selector = await self.nav.resolve(
+                            self.selectors,
+                            "timeoff_modal_body",
+                            timeout=5000,
+                            state="visible",
                         )
-                        await modal_body_locator.wait_for(timeout=5000)
+                        modal_body_locator = self.page.locator(modal_body_selector)
 
                         if await modal_body_locator.locator(
                             "span:has-text('1er mitad del día')"
@@ -148,82 +204,117 @@ class FactorialBot:
                         ).is_visible():
                             absence_type = "half_afternoon"
 
-                        print(f"  -> Type: {absence_type}")
+                        logger.info("  -> Type: %s", absence_type)
                         absences[date_key] = {"type": absence_type, "reason": reason}
 
                         await self.page.keyboard.press("Escape")
                         await asyncio.sleep(0.5)
                     except Exception as e:
-                        print(
-                            f"  -> Error reading modal for {date_key}: {e}. Assuming full day."
+                        logger.warning(
+                            "  -> Error reading modal for %s: %s. Assuming full day.",
+                            date_key,
+                            e,
+                        )
+                        await self.artifacts.capture(
+                            self.page, f"absence-modal-{date_key}"
                         )
                         absences[date_key] = {"type": "full", "reason": reason}
 
             except Exception as e:
-                print(f"Could not process date {date_key}: {e}")
+                logger.warning("Could not process date %s: %s", date_key, e)
+                await self.artifacts.capture(self.page, f"absence-{date_key}")
 
-        print(f"Absences detected: {absences}")
+        date_context.set(None)
+        logger.info("Absences detected: %d", len(absences))
+        logger.debug("Absences: %s", absences)
         return absences
 
     async def process_attendance(
         self, start_date: datetime, end_date: datetime, absences: Absences
-    ):
+    ) -> ReconciliationReport:
+        report = ReconciliationReport()
         year = start_date.year
         month = start_date.month
 
         url = f"{URL_ATTENDANCE_BASE}/{year}/{month}/1"
         await self.nav.goto(url)
+        month_rechecked = False
+        month_written = False
 
         current_date = start_date
         while current_date <= end_date:
             date_key = current_date.strftime("%Y-%m-%d")
-            day_of_week = current_date.weekday()
+            date_context.set(date_key)
+            is_working_day = self.schedule.is_working_day(current_date)
 
             if current_date.month != month:
-                print(f"Changing month to {current_date.strftime('%B')}")
+                await self._reconcile_month(
+                    report, year, month, start_date, end_date, absences, month_written
+                )
+                logger.info("Changing month to %s", current_date.strftime("%B"))
                 month = current_date.month
                 year = current_date.year
                 url = f"{URL_ATTENDANCE_BASE}/{year}/{month}/1"
                 await self.nav.goto(url)
+                month_rechecked = False
+                month_written = False
 
-            rows = self.page.locator(SELECTOR_ATTENDANCE_ROW)
-            target_row = None
-            for i in range(await rows.count()):
-                row = rows.nth(i)
-                row_text = (await row.text_content()) or ""
-                if row_text.strip().startswith(f"{current_date.day} "):
-                    target_row = row
-                    break
-
+            target_row = await self._find_row(current_date.day)
             if not target_row:
-                print(f"Row not found for {date_key}")
+                logger.warning("Row not found for %s", date_key)
+                await self.artifacts.capture(self.page, f"row-{date_key}")
+                if is_working_day:
+                    self.metrics.day("failed")
                 current_date += timedelta(days=1)
                 continue
 
-            if day_of_week >= 5:
+            if not is_working_day:
                 current_date += timedelta(days=1)
                 continue
 
             absence_info = absences.get(date_key)
             if absence_info and absence_info.get("type") == "full":
-                print(
-                    f"Skipping {date_key} (Full Day Absence: {absence_info.get('reason')})"
+                logger.info(
+                    "Skipping %s (Full Day Absence: %s)",
+                    date_key,
+                    absence_info.get("reason"),
                 )
+                self.metrics.day("skipped")
                 current_date += timedelta(days=1)
                 continue
 
             if "0h 00m" not in (await target_row.text_content()):
-                print(f"Skipping {date_key} (Already filled or non-working day)")
+                logger.info("Skipping %s (Already filled or non-working day)", date_key)
+                self.metrics.day("skipped")
                 current_date += timedelta(days=1)
                 continue
 
-            print(f"Processing {date_key}...")
+            logger.info("Processing %s...", date_key)
             if self.dry_run:
-                print("  -> Dry run: Skipping click and fill")
+                logger.info("  -> Dry run: Skipping click and fill")
+                self.metrics.day("skipped")
                 current_date += timedelta(days=1)
                 continue
 
-            await self._fill_hours_for_day(current_date, absence_info, target_row)
+            if not month_rechecked:
+                # The table was read when the month was loaded; another run or a manual
+                # edit may have filled days since, so reload once before the month's
+                # first write. Later days are read from the reloaded table.
+                month_rechecked = True
+                target_row = await self._reload_row_if_unfilled(url, current_date.day)
+                if target_row is None:
+                    logger.info(
+                        "Skipping %s (Filled since the month was loaded)", date_key
+                    )
+                    self.metrics.day("skipped")
+                    current_date += timedelta(days=1)
+                    continue
+
+            month_written = True
+            filled = await self._fill_hours_for_day(
+                current_date, absence_info, target_row
+            )
+            self.metrics.day("filled" if filled else "failed")
 
             try:
                 await asyncio.sleep(0.5)
@@ -231,34 +322,102 @@ class FactorialBot:
                     '[data-intercom-target="attendance-row-toggle"]'
                 ).click()
             except Exception as e:
-                print(f"  -> Warning: Could not collapse row for {date_key}: {e}")
+                logger.warning("  -> Could not collapse row for %s: %s", date_key, e)
+                await self.artifacts.capture(self.page, f"collapse-{date_key}")
 
             current_date += timedelta(days=1)
 
-    async def _fill_hours_for_day(
-        self, date: datetime, absence_info: Optional[AbsenceInfo], target_row
+        date_context.set(None)
+        await self._reconcile_month(
+            report, year, month, start_date, end_date, absences, month_written
+        )
+        return report
+
+    async def _find_row(self, day: int):
+        rows = self.page.locator(SELECTOR_ATTENDANCE_ROW)
+        for i in range(await rows.count()):
+            row = rows.nth(i)
+            row_text = (await row.text_content()) or ""
+            if row_text.strip().startswith(f"{day} "):
+                return row
+        return None
+
+    async def _reload_row_if_unfilled(self, url: str, day: int):
+        """Reloads the month and returns the day's row only if it still has no hours."""
+        await self.nav.goto(url)
+        row = await self._find_row(day)
+        if row is None or "0h 00m" not in ((await row.text_content()) or ""):
+            return None
+        return row
+
+    async def _reconcile_month(
+        self,
+        report: ReconciliationReport,
+        year: int,
+        month: int,
+        start_date: datetime,
+        end_date: datetime,
+        absences: Absences,
+        written: bool = False,
     ):
-        absence_type = absence_info.get("type") if absence_info else None
-        is_friday = date.weekday() == 4
-        date_key = date.strftime("%Y-%m-%d")
+        """
+        Checks the month's weekdays in range against one snapshot of the table.
+
+        After writing, the page shows the shifts it added whether or not they
+        were saved, so the month is reloaded first to read what the server has.
+        """
+        if self.dry_run:
+            return
 
-        shifts = []
-        if is_friday:
-            # On Fridays, half-day vacations are not considered, it's always a full continuous day.
-            shifts.append(tuple(self.schedule_config["friday_continuous"]))
-        else:
-            add_morning_shift = True
-            add_afternoon_shift = True
+        try:
+            if written:
+                await self.nav.goto(f"{URL_ATTENDANCE_BASE}/{year}/{month}/1")
+            # A single round-trip for every row, instead of one query per day
+            row_texts = await self.page.locator(
+                SELECTOR_ATTENDANCE_ROW
+            ).all_text_contents()
+        except Exception as e:
+            logger.warning("Could not read totals for %d-%02d: %s", year, month, e)
+            return
 
+        totals = parse_month_totals(row_texts)
+        current_date = max(start_date, datetime(year, month, 1))
+        while current_date <= end_date and current_date.month == month:
+            if self.schedule.is_working_day(current_date):
+                report.add(
+                    current_date.strftime("%Y-%m-%d"),
+                    self._expected_minutes(current_date, absences),
+                    totals.get(current_date.day),
+                )
+            current_date += timedelta(days=1)
+
+    def _expected_minutes(self, date: datetime, absences: Absences) -> int:
+        absence_info = absences.get(date.strftime("%Y-%m-%d"))
+        if absence_info and absence_info.get("type") == "full":
+            return 0
+        return shift_minutes(self._shifts_for_day(date, absence_info))
+
+    def _shifts_for_day(
+        self, date: datetime, absence_info: Optional[AbsenceInfo]
+    ) -> List[Shift]:
+        absence_type = absence_info.get("type") if absence_info else None
+        shifts = list(self.schedule.shifts_for(date))
+
+        # A single continuous shift (e.g. Fridays) ignores half-day absences
+        if len(shifts) > 1:
             if absence_type == "half_morning":
-                add_morning_shift = False
+                shifts = shifts[1:]
             elif absence_type == "half_afternoon":
-                add_afternoon_shift = False
+                shifts = shifts[:-1]
 
-            if add_morning_shift:
-                shifts.append(tuple(self.schedule_config["normal_day_morning"]))
-            if add_afternoon_shift:
-                shifts.append(tuple(self.schedule_config["normal_day_afternoon"]))
+        return shifts
+
+    async def _fill_hours_for_day(
+        self, date: datetime, absence_info: Optional[AbsenceInfo], target_row
+    ) -> bool:
+        """Adds the day's shifts. Returns False if any of them could not be applied."""
+        date_key = date.strftime("%Y-%m-%d")
+        shifts = self._shifts_for_day(date, absence_info)
 
         add_shift_button_selector = (
             '[data-intercom-target="attendance-row-add-shift-button"]'
@@ -274,14 +433,17 @@ class FactorialBot:
             ).click()
 
             # Wait for the "Añadir" button to be visible within that specific container
-            await shifts_container.locator(add_shift_button_selector).wait_for(
-                state="visible", timeout=5000
+            await self.nav.wait_for_locator(
+                shifts_container.locator(add_shift_button_selector), timeout=5000
             )
         except Exception as e:
-            print(
-                f"  -> Could not expand row or find 'Añadir' button for {date_key}: {e}"
+            logger.error(
+                "  -> Could not expand row or find 'Añadir' button for %s: %s",
+                date_key,
+                e,
             )
-            return
+            await self.artifacts.capture(self.page, f"expand-{date_key}")
+            return False
 
         for i, (start, end) in enumerate(shifts):
             try:
@@ -310,7 +472,13 @@ class FactorialBot:
                 await asyncio.sleep(1.5)
 
             except Exception as e:
-                print(f"  -> Error filling shift {start}-{end} for {date.date()}: {e}")
+                logger.error(
+                    "  -> Error filling shift %s-%s for %s: %s", start, end, date_key, e
+                )
+                # Captured before Escape so the snapshot still shows the modal
+                await self.artifacts.capture(self.page, f"fill-{date_key}")
                 if await self.page.is_visible(SELECTOR_MODAL_CONTENT_WRAPPER):
                     await self.page.keyboard.press("Escape")
-                break
+                return False
+
+        return True
@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from playwright.async_api import Browser, BrowserContext, Playwright
+from src.config import load_config_section
+
+logger = logging.getLogger(__name__)
+
+# Engine name -> (Playwright browser type, channel)
+ENGINES: Dict[str, Tuple[str, Optional[str]]] = {
+    "chromium": ("chromium", None),
+    "chromium-headless-shell": ("chromium", "chromium-headless-shell"),
+    "firefox": ("firefox", None),
+    "webkit": ("webkit", None),
+}
+
+DEFAULT_BROWSER = {
+    "profile": "default",
+    "profiles": {},
+}
+
+# Built-in profiles; [browser.profiles.<name>] in config.toml overrides or adds to these
+BUILTIN_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "lean": {
+        "engine": "chromium-headless-shell",
+        "args": [
+            "--disable-gpu",
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--disable-dev-shm-usage",
+            "--mute-audio",
+            "--no-first-run",
+            "--disk-cache-size=1048576",
+            "--media-cache-size=1048576",
+        ],
+        "viewport": {"width": 1024, "height": 700},
+    },
+}
+
+
+# Keys a [browser.profiles.<name>] table may set, i.e. LaunchProfile's options
+PROFILE_OPTIONS = ("engine", "channel", "headless", "args", "viewport")
+
+
+class LaunchProfile:
+    """A named set of browser launch and context options."""
+
+    def __init__(
+        self,
+        name: str,
+        engine: str = "chromium",
+        channel: Optional[str] = None,
+        headless: bool = True,
+        args: Optional[List[str]] = None,
+        viewport: Optional[Dict[str, int]] = None,
+    ):
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown browser engine '{engine}'. Available: {', '.join(ENGINES)}"
+            )
+        self.name = name
+        self.engine = engine
+        self.channel = channel
+        self.headless = headless
+        self.args = args or []
+        self.viewport = viewport
+
+    @property
+    def browser_type(self) -> str:
+        return ENGINES[self.engine][0]
+
+    def launch_options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"headless": self.headless}
+        channel = self.channel or ENGINES[self.engine][1]
+        if channel:
+            options["channel"] = channel
+        # Command-line switches are Chromium's; Firefox and WebKit reject them
+        if self.args and self.browser_type == "chromium":
+            options["args"] = self.args
+        return options
+
+    def context_options(self) -> Dict[str, Any]:
+        return {"viewport": self.viewport} if self.viewport else {}
+
+
+def load_launch_profile(
+    name: Optional[str] = None, engine: Optional[str] = None
+) -> LaunchProfile:
+    """
+    Returns the named profile, or the one selected under [browser] in config.toml.
+
+    `engine` (or [browser] engine) replaces the profile's engine, so any
+    profile can be tried on another browser.
+    """
+    config = load_config_section("browser", DEFAULT_BROWSER)
+    profiles = {**BUILTIN_PROFILES, **config["profiles"]}
+    name = name or config["profile"]
+    if name not in profiles:
+        raise ValueError(
+            f"Unknown browser profile '{name}'. Available: {', '.join(sorted(profiles))}"
+        )
+    options = dict(profiles[name])
+    unknown = set(options) - set(PROFILE_OPTIONS)
+    if unknown:
+        raise ValueError(
+            f"[browser.profiles.{name}]: unknown option(s) {', '.join(sorted(unknown))}."
+            f" Available: {', '.join(PROFILE_OPTIONS)}"
+        )
+    engine = engine or config.get("engine")
+    if engine:
+        options["engine"] = engine
+    return LaunchProfile(name, **options)
+
+
+async def launch_browser(
+    playwright: Playwright, profile: LaunchProfile
+) -> Tuple[Browser, float]:
+    """Launches a browser with the profile's options. Returns it with the launch time."""
+    browser_type = getattr(playwright, profile.browser_type)
+    start = time.monotonic()
+    browser = await browser_type.launch(**profile.launch_options())
+    elapsed = time.monotonic() - start
+    logger.info(
+        "Launched %s (profile '%s') in %.2fs", profile.engine, profile.name, elapsed
+    )
+    return browser, elapsed
+
+
+async def new_context(
+    browser: Browser, profile: LaunchProfile, **kwargs: Any
+) -> BrowserContext:
+    return await browser.new_context(**{**profile.context_options(), **kwargs})
+
+
+def process_tree_rss_bytes(root_pid: Optional[int] = None) -> Optional[int]:
+    """
+    Sums the resident memory of every descendant of a process (by default this one).
+
+    The Playwright driver and every browser process it starts are descendants of
+    the Python process, so differences between two readings give the cost of a
+    launch or a context. Returns None where /proc is not available.
+    """
+    root_pid = root_pid or os.getpid()
+    try:
+        pids = [int(entry) for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return None
+
+    children: Dict[int, List[int]] = {}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "r") as f:
+                # The command name may contain spaces, so split after its closing paren
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(pid)
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/statm", "r") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+class PeakMemorySampler:
+    """Polls process_tree_rss_bytes in the background and keeps the peak."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.peak: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self):
+        rss = process_tree_rss_bytes()
+        if rss is not None:
+            self.peak = max(self.peak or 0, rss)
+
+    async def _run(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self) -> "PeakMemorySampler":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self.sample()
@@ -0,0 +1,25 @@
+import logging
+import tomllib
+from typing import Any, Dict
+from src.constants import CONFIG_FILE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def load_config_section(
+    section: str, defaults: Dict[str, Any], path: str = CONFIG_FILE_PATH
+) -> Dict[str, Any]:
+    """Loads a section of config.toml, filling missing keys from the defaults."""
+    try:
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+    except (FileNotFoundError, tomllib.TOMLDecodeError) as e:
+        logger.warning(
+            "Could not load or parse %s (%s). Using default [%s] settings.",
+            path,
+            e,
+            section,
+        )
+        return dict(defaults)
+
+    return {**defaults, **config.get(section, {})}
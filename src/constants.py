@@ -18,6 +18,39 @@ SELECTOR_TIMEOFF_MODAL_BODY = "div._19gth1z7h"
 COLOR_VACACIONES = "rgb(7, 162, 173)"
 COLOR_BAJA = "rgb(255, 145, 83)"
 COLOR_OTRO = "rgb(226, 226, 229)"
+# Day cells of public holidays: the hashed class, then labels that survive a redeploy
+SELECTOR_TIMEOFF_HOLIDAY_MARKERS = [
+    ".htytoi",
+    "[aria-label*='festivo' i]",
+    "[title*='festivo' i]",
+]
+SELECTOR_TIMEOFF_HOLIDAY_CELL = (
+    f"{SELECTOR_TIMEOFF_DAY_CELL}:is({', '.join(SELECTOR_TIMEOFF_HOLIDAY_MARKERS)})"
+)
+
+# Fallback strategies for elements with hashed class names, in order of preference.
+# The first entry is the known class; the rest rely on roles, data attributes, structure
+# or visible text.
+SELECTOR_FALLBACKS = {
+    "timeoff_calendar": [
+        "ul.htyto0",
+        "ul:has(> li div[role='button'])",
+        "main ul:has(div[role='button'])",
+    ],
+    "timeoff_month_name": [
+        SELECTOR_TIMEOFF_MONTH_NAME,
+        "li:has(div[role='button']) > div:first-child",
+        "[data-testid*='month'] > div:first-child",
+        "div:text-matches('^(enero|febrero|marzo|abril|mayo|junio|julio|agosto"
+        "|septiembre|octubre|noviembre|diciembre)$', 'i')",
+    ],
+    "timeoff_modal_body": [
+        SELECTOR_TIMEOFF_MODAL_BODY,
+        "role=dialog",
+        "[data-state='open'][role='dialog']",
+        "div:has(> span:has-text('del día'))",
+    ],
+}
 
 # Selectores Attendance (Fichaje)
 SELECTOR_ATTENDANCE_ROW = "tr"
@@ -29,4 +62,15 @@ SELECTOR_MODAL_BUTTON_APLICAR = "//button[contains(text(), 'Aplicar')]"
 SELECTOR_ROW_BUTTON_ADD = "button svg use[href*='add']"
 
 # File paths
-AUTH_FILE_PATH = "data/auth.json"
+AUTH_FILE_PATH = "data/auth.json"  # Legacy single-account session, imported into the store
+SESSION_STORE_PATH = "data/sessions.db"
+SELECTOR_CACHE_PATH = "data/selector_cache.json"
+CONFIG_FILE_PATH = "config.toml"
+RECONCILIATION_REPORT_PATH = "data/reports/reconciliation-{account}.json"
+HAR_DIR_PATH = "data/har"
+BENCHMARK_REPORT_PATH = "data/reports/benchmark.json"
+ARTIFACTS_DIR_PATH = "data/artifacts"
+
+# Sessions
+DEFAULT_ACCOUNT = "default"
+SESSION_COOKIE_DOMAIN = "factorialhr.com"
@@ -0,0 +1,397 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from playwright.async_api import (
+    async_playwright,
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+)
+from src.artifacts import ArtifactCollector
+from src.bot import FactorialBot
+from src.browser import (
+    ENGINES,
+    LaunchProfile,
+    launch_browser,
+    load_launch_profile,
+    new_context,
+)
+from src.config import load_config_section
+from src.constants import DEFAULT_ACCOUNT, URL_DASHBOARD, URL_LOGIN
+from src.logging_config import (
+    account_context,
+    add_logging_arguments,
+    setup_logging_from_args,
+)
+from src.metrics import DEFAULT_METRICS, RunMetrics
+from src.navigator import Navigator
+from src.schedule import load_schedules
+from src.session_store import RunLockError, SessionStore
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+DEFAULT_DAEMON = {
+    "host": "127.0.0.1",
+    "port": 8080,
+    "session_check_minutes": 15,
+    "session_refresh_window_minutes": 360,
+    "accounts": [],
+}
+
+DEFAULT_ACCOUNT_SCHEDULE = {
+    "name": DEFAULT_ACCOUNT,
+    "days": ["mon", "tue", "wed", "thu", "fri"],
+    "time": "19:00",
+    "execute": False,
+}
+
+
+class ScheduledAccount:
+    def __init__(self, name: str, days: List[str], time: str, execute: bool):
+        self.name = name
+        self.weekdays = {WEEKDAYS[day.lower()[:3]] for day in days}
+        hour, minute = time.split(":")
+        self.hour = int(hour)
+        self.minute = int(minute)
+        self.execute = execute
+
+    def next_run(self, now: datetime) -> datetime:
+        """Returns the first scheduled run strictly after `now`."""
+        for offset in range(8):
+            candidate = (now + timedelta(days=offset)).replace(
+                hour=self.hour, minute=self.minute, second=0, microsecond=0
+            )
+            if candidate.weekday() in self.weekdays and candidate > now:
+                return candidate
+        raise ValueError(f"Account '{self.name}' has no scheduled weekdays")
+
+
+class Daemon:
+    """
+    Keeps a browser warm and runs the bot for each account on its schedule.
+
+    One browser is launched for the lifetime of the process and every account
+    keeps its own context between runs, so a scheduled run only pays for a new
+    page. Sessions close to expiry in the session store are refreshed in the
+    background and a small HTTP endpoint reports health and per-account status.
+    """
+
+    def __init__(
+        self,
+        accounts: List[ScheduledAccount],
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        session_check_minutes: float = 15,
+        session_refresh_window_minutes: float = 360,
+        store: Optional[SessionStore] = None,
+        metrics_dir: Optional[str] = None,
+        profile: Optional[LaunchProfile] = None,
+    ):
+        self.accounts = accounts
+        self.host = host
+        self.port = port
+        self.session_check_seconds = session_check_minutes * 60
+        self.session_refresh_window_seconds = session_refresh_window_minutes * 60
+        self.store = store or SessionStore()
+        self.metrics_dir = metrics_dir
+        self.profile = profile or LaunchProfile("default")
+        self.playwright: Optional[Playwright] = None
+        self.browser: Optional[Browser] = None
+        self.contexts: Dict[str, BrowserContext] = {}
+        # When the stored session each cached context was built from was saved
+        self.context_sessions: Dict[str, Optional[float]] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+        # When each expired session was saved; refreshes wait for a newer login
+        self.expired_sessions: Dict[str, Optional[float]] = {}
+        self.started_at = time.time()
+        self.status: Dict[str, Dict[str, Any]] = {
+            account.name: {"state": "idle", "next_run": None, "last_run": None}
+            for account in accounts
+        }
+
+    @classmethod
+    def from_config(cls) -> "Daemon":
+        config = load_config_section("daemon", DEFAULT_DAEMON)
+        metrics_config = load_config_section("metrics", DEFAULT_METRICS)
+        account_configs = config["accounts"] or [DEFAULT_ACCOUNT_SCHEDULE]
+        accounts = [
+            ScheduledAccount(**{**DEFAULT_ACCOUNT_SCHEDULE, **account})
+            for account in account_configs
+        ]
+        # Compiled once here; every scheduled run then shares the same tables
+        load_schedules()
+        return cls(
+            accounts,
+            host=config["host"],
+            port=config["port"],
+            session_check_minutes=config["session_check_minutes"],
+            session_refresh_window_minutes=config["session_refresh_window_minutes"],
+            metrics_dir=(
+                metrics_config["textfile_dir"] if metrics_config["enabled"] else None
+            ),
+            profile=load_launch_profile(),
+        )
+
+    async def run_forever(self):
+        async with async_playwright() as p:
+            self.playwright = p
+            self.locks = {account.name: asyncio.Lock() for account in self.accounts}
+            server = await asyncio.start_server(
+                self._handle_http, self.host, self.port
+            )
+            logger.info("Daemon listening on http://%s:%s", self.host, self.port)
+            try:
+                await asyncio.gather(
+                    *(self._schedule_loop(account) for account in self.accounts),
+                    self._refresh_loop(),
+                )
+            finally:
+                server.close()
+                await server.wait_closed()
+                await self._close_browser()
+
+    async def _schedule_loop(self, account: ScheduledAccount):
+        while True:
+            next_run = account.next_run(datetime.now())
+            self.status[account.name]["next_run"] = next_run.isoformat()
+            await asyncio.sleep((next_run - datetime.now()).total_seconds())
+            await self.run_account(account)
+
+    async def _refresh_loop(self):
+        accounts = {account.name: account for account in self.accounts}
+        while True:
+            await asyncio.sleep(self.session_check_seconds)
+            for name in self.store.needs_refresh(self.session_refresh_window_seconds):
+                if name in accounts and not self._awaiting_login(name):
+                    await self.refresh_session(accounts[name])
+
+    def _awaiting_login(self, name: str) -> bool:
+        """Whether the account's session expired and no new one has been saved."""
+        if name not in self.expired_sessions:
+            return False
+        if self.store.refreshed_at(name) == self.expired_sessions[name]:
+            return True
+        del self.expired_sessions[name]
+        return False
+
+    async def _ensure_browser(self) -> Browser:
+        if self.browser is None or not self.browser.is_connected():
+            self.contexts.clear()
+            self.browser, _ = await launch_browser(self.playwright, self.profile)
+        return self.browser
+
+    async def _close_browser(self):
+        for context in self.contexts.values():
+            await context.close()
+        self.contexts.clear()
+        if self.browser is not None:
+            await self.browser.close()
+            self.browser = None
+
+    async def _context_for(self, account: ScheduledAccount) -> BrowserContext:
+        browser = await self._ensure_browser()
+        refreshed_at = self.store.refreshed_at(account.name)
+        if refreshed_at != self.context_sessions.get(account.name):
+            # A newer session was saved elsewhere, e.g. by main.py --force-login
+            await self._drop_context(account)
+
+        context = self.contexts.get(account.name)
+        if context is None:
+            state = self.store.load(account.name)
+            if state is None:
+                raise RuntimeError(
+                    f"No stored session. Run main.py --account {account.name} --force-login"
+                )
+            context = await new_context(browser, self.profile, storage_state=state)
+            self.contexts[account.name] = context
+            self.context_sessions[account.name] = refreshed_at
+        return context
+
+    async def _save_session(
+        self, account: ScheduledAccount, context: BrowserContext, page: Page
+    ) -> bool:
+        """
+        Saves the context's cookies unless `page` ended up on the login page.
+        Returns False if the session has expired. The store lock is held while
+        checking and saving, so a session saved by another process is never
+        overwritten with this context's older cookies.
+        """
+        async with self.store.lock(account.name):
+            if URL_LOGIN in page.url:
+                return False
+            if self.store.refreshed_at(account.name) != self.context_sessions.get(
+                account.name
+            ):
+                logger.info(
+                    "A newer session for account '%s' was stored, keeping it",
+                    account.name,
+                )
+                await self._drop_context(account)
+                return True
+            self.store.save(account.name, await context.storage_state())
+            self.context_sessions[account.name] = self.store.refreshed_at(account.name)
+            return True
+
+    async def _session_expired(self, account: ScheduledAccount):
+        logger.warning(
+            "Session for account '%s' expired. Run main.py --force-login.",
+            account.name,
+        )
+        self.status[account.name]["session"] = "needs_login"
+        self.expired_sessions[account.name] = self.store.refreshed_at(account.name)
+        await self._drop_context(account)
+
+    async def _drop_context(self, account: ScheduledAccount):
+        self.context_sessions.pop(account.name, None)
+        context = self.contexts.pop(account.name, None)
+        if context is not None:
+            await context.close()
+
+    async def run_account(self, account: ScheduledAccount):
+        status = self.status[account.name]
+        account_context.set(account.name)
+        async with self.locks[account.name]:
+            status["state"] = "running"
+            started = time.time()
+            metrics = RunMetrics(account.name)
+            metrics.labels.update(profile=self.profile.name, engine=self.profile.engine)
+            artifacts = ArtifactCollector.from_config(account.name)
+            # Only executing runs write, so only they exclude a concurrent main.py run
+            run_lock = (
+                self.store.run_lock(account.name) if account.execute else nullcontext()
+            )
+            try:
+                async with run_lock:
+                    context = await self._context_for(account)
+                    page = await context.new_page()
+                    try:
+                        bot = FactorialBot(
+                            page,
+                            dry_run=not account.execute,
+                            account=account.name,
+                            metrics=metrics,
+                            artifacts=artifacts,
+                        )
+                        await bot.run()
+                    except Exception:
+                        await artifacts.capture(page, "bot")
+                        raise
+                    finally:
+                        await page.close()
+                    # Persist cookies rotated during the run. An expired session does
+                    # not make the bot fail (it just finds nothing), so check here.
+                    if not await self._save_session(account, context, page):
+                        await self._session_expired(account)
+                        raise RuntimeError("session expired, run main.py --force-login")
+                    metrics.success = True
+                    status["last_result"] = "ok"
+            except RunLockError as e:
+                logger.warning("Skipping run: %s", e)
+                status["last_result"] = "skipped: another run in progress"
+            except Exception as e:
+                logger.error("Run for account '%s' failed: %s", account.name, e)
+                status["last_result"] = f"error: {e}"
+                await self._drop_context(account)
+            finally:
+                status["state"] = "idle"
+                status["last_run"] = datetime.fromtimestamp(started).isoformat()
+                status["last_duration_seconds"] = round(time.time() - started, 2)
+                if self.metrics_dir:
+                    metrics.write_textfile(self.metrics_dir)
+
+    async def refresh_session(self, account: ScheduledAccount):
+        """Touches the dashboard so the session is renewed before it expires."""
+        status = self.status[account.name]
+        account_context.set(account.name)
+        async with self.locks[account.name]:
+            try:
+                context = await self._context_for(account)
+                page = await context.new_page()
+                try:
+                    await Navigator(page).goto(URL_DASHBOARD)
+                finally:
+                    await page.close()
+                session_valid = await self._save_session(account, context, page)
+            except Exception as e:
+                logger.error(
+                    "Session refresh for account '%s' failed: %s", account.name, e
+                )
+                await self._drop_context(account)
+                return
+
+            if session_valid:
+                status["session"] = "valid"
+                status["session_refreshed"] = datetime.now().isoformat()
+            else:
+                await self._session_expired(account)
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "browser_connected": bool(self.browser and self.browser.is_connected()),
+            "accounts": self.status,
+        }
+
+    async def _handle_http(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            request_line = await reader.readline()
+            # Headers are not needed, but they must be consumed before replying
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            path = parts[1] if len(parts) > 1 else ""
+            if path in ("/health", "/status"):
+                code, body = "200 OK", self.health()
+            else:
+                code, body = "404 Not Found", {"error": "not found"}
+
+            payload = json.dumps(body).encode()
+            writer.write(
+                f"HTTP/1.1 {code}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode()
+                + payload
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def main_async():
+    parser = argparse.ArgumentParser(description="FactorialHR Auto Clock-in Daemon")
+    parser.add_argument("--host", help="Address for the health/status endpoint")
+    parser.add_argument("--port", type=int, help="Port for the health/status endpoint")
+    parser.add_argument(
+        "--engine", choices=list(ENGINES), help="Browser engine for every account"
+    )
+    add_logging_arguments(parser)
+
+    args = parser.parse_args()
+
+    setup_logging_from_args(args)
+
+    daemon = Daemon.from_config()
+    if args.host:
+        daemon.host = args.host
+    if args.port:
+        daemon.port = args.port
+    if args.engine:
+        daemon.profile = load_launch_profile(daemon.profile.name, engine=args.engine)
+
+    logger.info("Starting FactorialBot daemon for %d account(s)", len(daemon.accounts))
+    await daemon.run_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
@@ -0,0 +1,67 @@
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+from playwright.async_api import BrowserContext
+from src.constants import HAR_DIR_PATH
+
+logger = logging.getLogger(__name__)
+
+HAR_RECORD = "record"
+HAR_REPLAY = "replay"
+
+
+def har_path(account: str, phase: str, har_dir: str = HAR_DIR_PATH) -> str:
+    return os.path.join(har_dir, f"{account}-{phase}.har")
+
+
+async def route_from_har(
+    context: BrowserContext,
+    mode: Optional[str],
+    account: str,
+    phase: str,
+    har_dir: str = HAR_DIR_PATH,
+):
+    """
+    Records or replays a context's traffic.
+
+    In record mode the HAR is written when the context closes. In replay mode
+    every request is served from the HAR and anything missing is aborted, so a
+    replayed run never reaches the live site.
+    """
+    if mode is None:
+        return
+
+    path = har_path(account, phase, har_dir)
+    if mode == HAR_RECORD:
+        os.makedirs(har_dir, exist_ok=True)
+        logger.info("Recording traffic to %s", path)
+        await context.route_from_har(path, update=True, update_content="embed")
+    elif mode == HAR_REPLAY:
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"No recording found at {path}. Run with --record first."
+            )
+        logger.info("Replaying traffic from %s", path)
+        await context.route_from_har(path, not_found="abort")
+    else:
+        raise ValueError(f"Unknown HAR mode: {mode}")
+
+
+def save_recorded_date(account: str, today: datetime, har_dir: str = HAR_DIR_PATH):
+    """Remembers the date of a recording so a replay processes the same range."""
+    os.makedirs(har_dir, exist_ok=True)
+    with open(os.path.join(har_dir, f"{account}-run.json"), "w") as f:
+        json.dump({"today": today.isoformat()}, f)
+
+
+def load_recorded_date(account: str, har_dir: str = HAR_DIR_PATH) -> datetime:
+    path = os.path.join(har_dir, f"{account}-run.json")
+    try:
+        with open(path, "r") as f:
+            return datetime.fromisoformat(json.load(f)["today"])
+    except (FileNotFoundError, KeyError, ValueError) as e:
+        raise FileNotFoundError(
+            f"No recorded run found at {path}. Run with --record first."
+        ) from e
@@ -0,0 +1,125 @@
+import argparse
+import atexit
+import json
+import logging
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from src.config import load_config_section
+
+# Context fields attached to every record logged from the current task
+account_context: ContextVar[Optional[str]] = ContextVar("account", default=None)
+date_context: ContextVar[Optional[str]] = ContextVar("date", default=None)
+
+DEFAULT_LOGGING = {
+    "level": "INFO",
+    "json": False,
+}
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(context)s%(message)s"
+
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+class ContextFilter(logging.Filter):
+    """Copies the account/date context variables onto each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.account = account_context.get()
+        record.date = date_context.get()
+        fields = [value for value in (record.account, record.date) if value]
+        record.context = f"[{' '.join(fields)}] " if fields else ""
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in ("account", "date"):
+            value = getattr(record, field, None)
+            if value:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(level: str = "INFO", json_output: bool = False):
+    """
+    Routes all logging through a queue drained by a background thread.
+
+    Callers on the event loop only enqueue the record; formatting and the
+    write to stdout happen on the listener thread. Calling this again just
+    updates the level and format.
+    """
+    global _queue_handler, _listener
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(
+        JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT, "%H:%M:%S")
+    )
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+
+    shutdown_logging()
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    # Context variables must be read in the producing task, not on the listener thread
+    _queue_handler.addFilter(ContextFilter())
+    root.addHandler(_queue_handler)
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def add_logging_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--log-level",
+        type=str.upper,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Log verbosity (default: [logging] level in config.toml)",
+    )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        default=None,
+        help="Write logs as JSON lines",
+    )
+
+
+def setup_logging_from_args(args: argparse.Namespace):
+    config = load_config_section("logging", DEFAULT_LOGGING)
+    setup_logging(
+        level=args.log_level or config["level"],
+        json_output=args.log_json or config["json"],
+    )
+
+
+def shutdown_logging():
+    """
+    Flushes queued records and detaches the queue handler. Registered at exit
+    so nothing is lost on sys.exit.
+    """
+    global _queue_handler, _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+atexit.register(shutdown_logging)
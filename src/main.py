@@ -1,9 +1,41 @@
 import argparse
+import logging
 import sys
 import asyncio
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Optional
 from playwright.async_api import async_playwright
+from src.artifacts import ArtifactCollector
 from src.auth import Authenticator
 from src.bot import FactorialBot
+from src.browser import (
+    ENGINES,
+    LaunchProfile,
+    launch_browser,
+    load_launch_profile,
+    new_context,
+    process_tree_rss_bytes,
+)
+from src.config import load_config_section
+from src.constants import DEFAULT_ACCOUNT
+from src.har import (
+    HAR_RECORD,
+    HAR_REPLAY,
+    load_recorded_date,
+    route_from_har,
+    save_recorded_date,
+)
+from src.logging_config import (
+    account_context,
+    add_logging_arguments,
+    setup_logging_from_args,
+)
+from src.metrics import DEFAULT_METRICS, RunMetrics
+from src.schedule import get_schedule
+from src.session_store import RunLockError, SessionStore, check_account_name
+
+logger = logging.getLogger(__name__)
 
 
 async def main_async():
@@ -14,36 +46,153 @@ async def main_async():
     parser.add_argument(
         "--force-login", action="store_true", help="Force interactive login"
     )
+    parser.add_argument(
+        "--account",
+        default=DEFAULT_ACCOUNT,
+        help="Account whose stored session is used (default: %(default)s)",
+    )
+    har_group = parser.add_mutually_exclusive_group()
+    har_group.add_argument(
+        "--record",
+        action="store_true",
+        help="Record this run's traffic to a HAR under data/har/",
+    )
+    har_group.add_argument(
+        "--replay",
+        action="store_true",
+        help="Replay the last recorded run offline instead of using the live site",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Browser launch profile from config.toml, e.g. 'lean' (default: [browser] profile)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=list(ENGINES),
+        help="Browser engine, overriding the profile's (default: [browser] engine or chromium)",
+    )
+    add_logging_arguments(parser)
 
     args = parser.parse_args()
+    if args.replay and args.execute:
+        # A replay is served from the HAR, so its writes could never reach Factorial
+        parser.error("--replay cannot be combined with --execute")
+
+    setup_logging_from_args(args)
+    account_context.set(args.account)
 
     dry_run = not args.execute
+    har_mode = HAR_RECORD if args.record else HAR_REPLAY if args.replay else None
 
-    print(f"Starting FactorialBot (Dry Run: {dry_run})")
+    logger.info("Starting FactorialBot (Dry Run: %s)", dry_run)
 
-    # 1. Authentication
+    today = datetime.now()
     try:
-        authenticator = Authenticator(force_login=args.force_login)
-        auth_file = await authenticator.authenticate()
-    except Exception as e:
-        print(f"Authentication failed: {e}")
+        check_account_name(args.account)
+        if har_mode == HAR_REPLAY:
+            today = load_recorded_date(args.account)
+            logger.info("Replaying run recorded on %s", today.date())
+        elif har_mode == HAR_RECORD:
+            save_recorded_date(args.account, today)
+        profile = load_launch_profile(args.profile, engine=args.engine)
+        # Fails on an invalid [schedule] before a browser is started
+        get_schedule(args.account)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error("%s", e)
         sys.exit(1)
 
-    # 2. Run Bot
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)  # Or False for debugging
-        context = await browser.new_context(storage_state=auth_file)
-        page = await context.new_page()
-
-        try:
-            bot = FactorialBot(page, dry_run=dry_run)
-            await bot.run()
-        except Exception as e:
-            print(f"Bot execution failed: {e}")
-            sys.exit(1)
-        finally:
-            await context.close()
-            await browser.close()
+    store = SessionStore()
+    # Dry runs never write, so only executing runs have to exclude each other
+    run_lock = nullcontext() if dry_run else store.run_lock(args.account)
+    try:
+        async with run_lock:
+            await _run(args, store, profile, dry_run, har_mode, today)
+    except RunLockError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+
+
+async def _run(
+    args: argparse.Namespace,
+    store: SessionStore,
+    profile: LaunchProfile,
+    dry_run: bool,
+    har_mode: Optional[str],
+    today: datetime,
+):
+    """Authenticates and runs the bot once for the account."""
+    metrics = RunMetrics(account=args.account)
+    metrics.labels["profile"] = profile.name
+    metrics.labels["engine"] = profile.engine
+    artifacts = ArtifactCollector.from_config(args.account)
+    try:
+        # 1. Authentication
+        with metrics.phase("authentication"):
+            try:
+                authenticator = Authenticator(
+                    force_login=args.force_login,
+                    account=args.account,
+                    har_mode=har_mode,
+                    store=store,
+                    profile=profile,
+                    artifacts=artifacts,
+                )
+                storage_state = await authenticator.authenticate()
+            except Exception as e:
+                logger.error("Authentication failed: %s", e)
+                sys.exit(1)
+
+        # 2. Run Bot
+        async with async_playwright() as p:
+            rss_before_launch = process_tree_rss_bytes()
+            browser, launch_seconds = await launch_browser(p, profile)
+            metrics.set("browser_launch_seconds", launch_seconds)
+            rss_after_launch = process_tree_rss_bytes()
+            context = await new_context(browser, profile, storage_state=storage_state)
+
+            page = None
+            try:
+                await route_from_har(context, har_mode, args.account, "bot")
+                page = await context.new_page()
+                bot = FactorialBot(
+                    page,
+                    dry_run=dry_run,
+                    account=args.account,
+                    offline=har_mode == HAR_REPLAY,
+                    metrics=metrics,
+                    artifacts=artifacts,
+                )
+                await bot.run(today=today)
+                metrics.success = True
+                _record_memory(metrics, rss_before_launch, rss_after_launch)
+            except Exception as e:
+                logger.error("Bot execution failed: %s", e)
+                await artifacts.capture(page, "bot")
+                sys.exit(1)
+            finally:
+                await context.close()
+                await browser.close()
+    finally:
+        metrics_config = load_config_section("metrics", DEFAULT_METRICS)
+        # Offline replay timings would skew the live account's dashboards
+        if metrics_config["enabled"] and har_mode != HAR_REPLAY:
+            metrics.write_textfile(metrics_config["textfile_dir"])
+
+
+def _record_memory(
+    metrics: RunMetrics, before_launch: Optional[int], after_launch: Optional[int]
+):
+    """Records browser and per-context RSS while the context is still open."""
+    after_run = process_tree_rss_bytes()
+    if None in (before_launch, after_launch, after_run):
+        return
+    metrics.set("browser_rss_bytes", after_run - before_launch)
+    metrics.set("context_rss_bytes", after_run - after_launch)
+    logger.info(
+        "Memory: browser %.1f MiB, context %.1f MiB",
+        (after_run - before_launch) / 2**20,
+        (after_run - after_launch) / 2**20,
+    )
 
 
 if __name__ == "__main__":
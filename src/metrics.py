@@ -0,0 +1,129 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from src.constants import DEFAULT_ACCOUNT
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "fucktorial"
+
+DEFAULT_METRICS = {
+    "enabled": True,
+    "textfile_dir": "data/metrics",
+}
+
+# name -> help text; every metric is a gauge holding the value from the last run
+METRIC_HELP = {
+    "run_duration_seconds": "Wall time of the last run.",
+    "phase_duration_seconds": "Wall time spent in each phase of the last run.",
+    "run_success": "Whether the last run completed without errors (1) or not (0).",
+    "last_run_timestamp_seconds": "Unix time at which the last run finished.",
+    "browser_launch_seconds": "Time taken to launch the browser.",
+    "browser_rss_bytes": "Resident memory of the browser processes at the end of the run.",
+    "context_rss_bytes": "Resident memory added by the bot's browser context.",
+    "days": "Weekdays handled in the last run, by outcome.",
+    "absences_detected": "Absences found in the time-off calendar.",
+    "navigations": "Page navigations performed.",
+    "timeouts": "Timeouts hit while waiting for the page.",
+}
+
+
+class RunMetrics:
+    """
+    Aggregates the numbers of a single run for the node-exporter textfile collector.
+
+    Values are kept in plain dicts while the run is in progress and only
+    rendered once at the end, so instrumenting the hot loops costs a dict update.
+    """
+
+    def __init__(self, account: str = DEFAULT_ACCOUNT):
+        self.account = account
+        self.started = time.monotonic()
+        self.values: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+        self.days: Dict[str, int] = {"filled": 0, "skipped": 0, "failed": 0}
+        self.success = False
+        # Extra labels added to every sample, e.g. the browser launch profile
+        self.labels: Dict[str, str] = {}
+
+    def inc(self, name: str, amount: float = 1):
+        self.values[name] = self.values.get(name, 0) + amount
+
+    def set(self, name: str, value: float):
+        self.values[name] = value
+
+    def day(self, outcome: str):
+        self.days[outcome] += 1
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.monotonic() - start
+
+    def render(self) -> str:
+        samples = {
+            "run_duration_seconds": [({}, time.monotonic() - self.started)],
+            "phase_duration_seconds": [
+                ({"phase": phase}, seconds) for phase, seconds in self.phases.items()
+            ],
+            "run_success": [({}, 1 if self.success else 0)],
+            "last_run_timestamp_seconds": [({}, time.time())],
+            "days": [
+                ({"outcome": outcome}, count) for outcome, count in self.days.items()
+            ],
+        }
+        for name in (
+            "browser_launch_seconds",
+            "browser_rss_bytes",
+            "context_rss_bytes",
+            "absences_detected",
+        ):
+            if name in self.values:
+                samples[name] = [({}, self.values[name])]
+        for name in ("navigations", "timeouts"):
+            samples[name] = [({}, self.values.get(name, 0))]
+
+        lines = []
+        for name, series in samples.items():
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {METRIC_HELP[name]}")
+            lines.append(f"# TYPE {metric} gauge")
+            for labels, value in series:
+                lines.append(f"{metric}{self._labels(labels)} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _labels(self, extra: Dict[str, str]) -> str:
+        labels = {"account": self.account, **self.labels, **extra}
+        pairs = ",".join(
+            f'{key}="{_escape(str(value))}"' for key, value in labels.items()
+        )
+        return "{" + pairs + "}"
+
+    def write_textfile(self, directory: str) -> Optional[str]:
+        """Atomically writes the metrics to <directory>/fucktorial-<account>.prom."""
+        path = os.path.join(directory, f"{METRIC_PREFIX}-{self.account}.prom")
+        # The collector only reads *.prom, so it never sees a partially written file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not write metrics to %s (%s)", path, e)
+            return None
+        return path
+
+
+def _format(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -1,39 +1,89 @@
-from playwright.async_api import Page, Locator, TimeoutError as PlaywrightTimeoutError
+import logging
+from typing import Optional
+from playwright.async_api import (
+    Page,
+    Locator,
+    Response,
+    Route,
+    TimeoutError as PlaywrightTimeoutError,
+)
+from src.metrics import RunMetrics
+from src.rate_limiter import RateLimiter, ThrottledError
+from src.selector_registry import SelectorRegistry
 import asyncio
 
+logger = logging.getLogger(__name__)
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
 
 class Navigator:
-    def __init__(self, page: Page):
+    def __init__(
+        self,
+        page: Page,
+        limiter: Optional[RateLimiter] = None,
+        metrics: Optional[RunMetrics] = None,
+    ):
         self.page = page
+        self.limiter = limiter or RateLimiter.for_tenant()
+        self.metrics = metrics or RunMetrics()
+
+    async def goto(self, url: str) -> Optional[Response]:
+        logger.debug("Navigating to %s", url)
+        return await self.limiter.request(lambda: self._load(url))
 
-    async def goto(self, url: str):
-        print(f"Navigating to {url}")
-        await self.page.goto(url)
-        await self.page.wait_for_load_state("networkidle")
+    async def _load(self, url: str) -> Optional[Response]:
+        self.metrics.inc("navigations")
+        try:
+            response = await self.page.goto(url)
+            await self.page.wait_for_load_state("networkidle")
+        except PlaywrightTimeoutError:
+            self.metrics.inc("timeouts")
+            raise
+        return response
+
+    async def throttle_writes(self):
+        """Routes write requests to the tenant's API through the rate limiter."""
+        for pattern in self.limiter.api_patterns:
+            await self.page.route(pattern, self._route_write)
+
+    async def _route_write(self, route: Route):
+        if route.request.method not in WRITE_METHODS:
+            await route.fallback()
+            return
+        try:
+            response = await self.limiter.request(route.fetch)
+        except ThrottledError as e:
+            logger.error("%s: %s %s", e, route.request.method, route.request.url)
+            # Let the page see the throttling response rather than a hung request
+            response = e.response
+        await route.fulfill(response=response)
 
     async def safe_click(self, selector: str, timeout: int = 5000):
         try:
-            print(f"Clicking {selector}")
+            logger.debug("Clicking %s", selector)
             await self.page.wait_for_selector(
                 selector, state="visible", timeout=timeout
             )
             await self.page.click(selector)
         except PlaywrightTimeoutError:
-            print(
-                f"Error: Element {selector} not found or not visible within {timeout}ms"
+            self.metrics.inc("timeouts")
+            logger.warning(
+                "Element %s not found or not visible within %sms", selector, timeout
             )
             raise
 
     async def fill_input(self, selector: str, value: str, timeout: int = 5000):
         try:
-            print(f"Filling {selector}")
+            logger.debug("Filling %s", selector)
             locator = self.page.locator(selector)
             await locator.wait_for(state="visible", timeout=timeout)
             await locator.click()
             await locator.fill(value)
         except PlaywrightTimeoutError:
-            print(
-                f"Error: Element {selector} not found or not visible within {timeout}ms"
+            self.metrics.inc("timeouts")
+            logger.warning(
+                "Element %s not found or not visible within %sms", selector, timeout
             )
             raise
 
@@ -44,13 +94,41 @@ class Navigator:
             )
             return await self.page.text_content(selector) or ""
         except PlaywrightTimeoutError:
-            print(f"Error: Element {selector} not found for text extraction")
+            self.metrics.inc("timeouts")
+            logger.warning("Element %s not found for text extraction", selector)
             raise
 
     async def wait_for_selector(self, selector: str, timeout: int = 5000) -> Locator:
-        return await self.page.wait_for_selector(
-            selector, state="visible", timeout=timeout
-        )
+        try:
+            return await self.page.wait_for_selector(
+                selector, state="visible", timeout=timeout
+            )
+        except PlaywrightTimeoutError:
+            self.metrics.inc("timeouts")
+            raise
+
+    async def wait_for_locator(
+        self, locator: Locator, state: str = "visible", timeout: int = 5000
+    ):
+        try:
+            await locator.wait_for(state=state, timeout=timeout)
+        except PlaywrightTimeoutError:
+            self.metrics.inc("timeouts")
+            raise
+
+    async def resolve(
+        self,
+        selectors: SelectorRegistry,
+        name: str,
+        timeout: int = 5000,
+        state: str = "attached",
+    ) -> str:
+        """Resolves a registry element on this page; see SelectorRegistry.resolve."""
+        try:
+            return await selectors.resolve(self.page, name, timeout=timeout, state=state)
+        except PlaywrightTimeoutError:
+            self.metrics.inc("timeouts")
+            raise
 
     async def is_visible(self, selector: str) -> bool:
         return await self.page.is_visible(selector)
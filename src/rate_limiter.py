@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+from src.config import load_config_section
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_RATE_LIMIT = {
+    "tenant": "default",
+    "requests_per_second": 2.0,
+    "burst": 5,
+    "max_retries": 4,
+    "backoff_base": 1.0,
+    "backoff_max": 30.0,
+    "retry_statuses": [429, 503],
+    "api_patterns": ["https://api.factorialhr.com/**"],
+}
+
+
+class ThrottledError(RuntimeError):
+    """The tenant kept throttling a request after every retry."""
+
+    def __init__(self, tenant: str, response: Any, attempts: int):
+        super().__init__(
+            f"Tenant '{tenant}' still throttled (HTTP {response.status}) "
+            f"after {attempts} attempts"
+        )
+        self.response = response
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _reserve(self) -> float:
+        # Tokens may go negative: each caller reserves its slot and sleeps until it is due.
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """
+    Paces requests to a Factorial tenant.
+
+    One limiter exists per tenant and is shared by every Navigator in the
+    process, so several accounts on the same tenant draw from the same bucket.
+    A throttling response pauses all of them until the backoff has elapsed.
+    """
+
+    _tenants: Dict[str, "RateLimiter"] = {}
+    _config: Optional[Dict[str, Any]] = None
+
+    def __init__(
+        self,
+        tenant: str,
+        requests_per_second: float,
+        burst: int,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        retry_statuses: List[int],
+        api_patterns: List[str],
+    ):
+        self.tenant = tenant
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = set(retry_statuses)
+        self.api_patterns = api_patterns
+        self._blocked_until = 0.0
+
+    @classmethod
+    def for_tenant(cls, tenant: Optional[str] = None) -> "RateLimiter":
+        """Returns the process-wide limiter for a tenant; [rate_limit] is read once."""
+        limiter = cls.from_config(tenant)
+        return cls._tenants.setdefault(limiter.tenant, limiter)
+
+    @classmethod
+    def from_config(cls, tenant: Optional[str] = None) -> "RateLimiter":
+        """A new limiter with the [rate_limit] settings, not shared with anyone."""
+        if cls._config is None:
+            cls._config = load_config_section("rate_limit", DEFAULT_RATE_LIMIT)
+        return cls(**{**cls._config, "tenant": tenant or cls._config["tenant"]})
+
+    @classmethod
+    def unthrottled(cls, tenant: str = "unthrottled") -> "RateLimiter":
+        """A private limiter that never waits or retries, e.g. for benchmarks."""
+        return cls(
+            tenant=tenant,
+            requests_per_second=1e9,
+            burst=1_000_000,
+            max_retries=0,
+            backoff_base=0.0,
+            backoff_max=0.0,
+            retry_statuses=[],
+            api_patterns=[],
+        )
+
+    @classmethod
+    def reset(cls):
+        """Forgets the shared limiters and the loaded config (used by tests)."""
+        cls._tenants.clear()
+        cls._config = None
+
+    async def acquire(self):
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self.bucket.acquire()
+
+    def backoff_delay(self, attempt: int) -> float:
+        # Full jitter keeps parallel accounts from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def is_throttled(self, response: Any) -> bool:
+        return response is not None and response.status in self.retry_statuses
+
+    def throttle(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            delay = min(retry_after, self.backoff_max)
+        else:
+            delay = self.backoff_delay(attempt)
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        logger.warning(
+            "Throttled by tenant '%s', backing off %.1fs", self.tenant, delay
+        )
+        return delay
+
+    async def request(self, send: Callable[[], Awaitable[T]]) -> T:
+        """
+        Sends a request within the rate limit.
+
+        Throttling responses are retried with backoff. Raises ThrottledError if
+        the tenant is still throttling once max_retries is exhausted; any other
+        error from `send` is raised as is.
+        """
+        attempt = 0
+        while True:
+            await self.acquire()
+            response = await send()
+            if not self.is_throttled(response):
+                return response
+            if attempt >= self.max_retries:
+                raise ThrottledError(self.tenant, response, attempt + 1)
+            self.throttle(attempt, _retry_after(response))
+            attempt += 1
+
+
+def _retry_after(response: Any) -> Optional[float]:
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
@@ -0,0 +1,86 @@
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# e.g. "13 lun. 7h 30m ..." -> day 13, total 7h 30m
+ROW_DAY_PATTERN = re.compile(r"^\s*(\d{1,2})\s")
+ROW_TOTAL_PATTERN = re.compile(r"(\d+)h\s*(\d+)m")
+
+STATUS_OK = "ok"
+STATUS_RETRY = "retry"
+STATUS_MANUAL = "manual"
+
+
+def to_minutes(time_str: str) -> int:
+    hours, minutes = time_str.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def shift_minutes(shifts: Iterable[Tuple[str, str]]) -> int:
+    return sum(to_minutes(end) - to_minutes(start) for start, end in shifts)
+
+
+def parse_month_totals(row_texts: Iterable[str]) -> Dict[int, int]:
+    """Maps day of month to logged minutes from the attendance table's row texts."""
+    totals: Dict[int, int] = {}
+    for text in row_texts:
+        day_match = ROW_DAY_PATTERN.match(text or "")
+        total_match = ROW_TOTAL_PATTERN.search(text or "")
+        if day_match and total_match:
+            day = int(day_match.group(1))
+            totals.setdefault(
+                day, int(total_match.group(1)) * 60 + int(total_match.group(2))
+            )
+    return totals
+
+
+class ReconciliationReport:
+    """Compares logged per-day totals against the expected schedule."""
+
+    def __init__(self):
+        self.entries: List[Dict[str, Any]] = []
+
+    def add(self, date_key: str, expected: int, actual: Optional[int]):
+        if actual is None:
+            status, reason = STATUS_MANUAL, "row_missing"
+        elif actual == expected:
+            status, reason = STATUS_OK, None
+        elif actual == 0:
+            # Nothing landed, so repeating the write cannot double-book the day
+            status, reason = STATUS_RETRY, "no_hours_logged"
+        else:
+            status, reason = STATUS_MANUAL, "hours_mismatch"
+
+        self.entries.append(
+            {
+                "date": date_key,
+                "status": status,
+                "reason": reason,
+                "expected_minutes": expected,
+                "actual_minutes": actual,
+            }
+        )
+
+    def needing_attention(self) -> List[Dict[str, Any]]:
+        return [entry for entry in self.entries if entry["status"] != STATUS_OK]
+
+    def to_dict(self) -> Dict[str, Any]:
+        counts = {STATUS_OK: 0, STATUS_RETRY: 0, STATUS_MANUAL: 0}
+        for entry in self.entries:
+            counts[entry["status"]] += 1
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "summary": counts,
+            "days": self.entries,
+        }
+
+    def write(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
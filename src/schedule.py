@@ -0,0 +1,215 @@
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
+from src.config import load_config_section
+from src.constants import CONFIG_FILE_PATH
+
+Shift = Tuple[str, str]
+Shifts = Tuple[Shift, ...]
+# Shifts for Monday..Sunday; None in an override means "as the base week"
+WeekTable = Tuple[Optional[Shifts], ...]
+
+WEEKDAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+DEFAULT_SCHEDULE = {
+    "normal_day_morning": ["08:30", "14:00"],
+    "normal_day_afternoon": ["15:00", "18:00"],
+    "friday_continuous": ["08:30", "15:00"],
+}
+
+TIME_PATTERN = re.compile(r"^([01]\d|2[0-3]):[0-5]\d$")
+
+# Half-day absences drop the morning or the afternoon shift, which is only
+# well defined for a single continuous shift or a morning/afternoon pair
+MAX_SHIFTS_PER_DAY = 2
+
+
+@dataclass(frozen=True)
+class ScheduleOverride:
+    """Shifts that replace the base week between two dates, both included."""
+
+    start: date
+    end: date
+    week: WeekTable
+
+    def covers(self, day: date) -> bool:
+        return self.start <= day <= self.end
+
+
+@dataclass(frozen=True)
+class Schedule:
+    """
+    An account's compiled work schedule.
+
+    Everything is resolved to tuples when config.toml is parsed, so looking
+    up a day is an index into the week plus a scan of the (few) date-range
+    overrides. Instances are frozen because every run in the process shares
+    them.
+    """
+
+    week: Tuple[Shifts, ...]
+    overrides: Tuple[ScheduleOverride, ...] = ()
+    holidays: FrozenSet[date] = frozenset()
+
+    def shifts_for(self, day: Union[date, datetime]) -> Shifts:
+        """Shifts to work on `day`; empty on non-working days and holidays."""
+        if isinstance(day, datetime):
+            day = day.date()
+        if day in self.holidays:
+            return ()
+        return self._scheduled(day)
+
+    def is_holiday(self, day: Union[date, datetime]) -> bool:
+        if isinstance(day, datetime):
+            day = day.date()
+        return day in self.holidays
+
+    def is_working_day(self, day: Union[date, datetime]) -> bool:
+        """Whether the day would have shifts if it were not a holiday."""
+        if isinstance(day, datetime):
+            day = day.date()
+        return bool(self._scheduled(day))
+
+    def _scheduled(self, day: date) -> Shifts:
+        weekday = day.weekday()
+        # Earlier overrides win, so account overrides come before shared ones
+        for override in self.overrides:
+            if override.covers(day) and override.week[weekday] is not None:
+                return override.week[weekday]
+        return self.week[weekday]
+
+
+def get_schedule(
+    account: Optional[str] = None, path: str = CONFIG_FILE_PATH
+) -> Schedule:
+    """
+    Returns the schedule for an account, falling back to the shared one.
+
+    config.toml is read and validated once per path; later calls return the
+    same Schedule objects.
+    """
+    schedules = load_schedules(path)
+    return schedules.get(account, schedules[None])
+
+
+def load_schedules(path: str = CONFIG_FILE_PATH) -> Mapping[Optional[str], Schedule]:
+    """
+    Compiles [schedule] and each [schedule.accounts.<name>] in config.toml.
+
+    Raises ValueError if any of them is invalid. The shared schedule is
+    stored under the key None.
+    """
+    # Cached by absolute path, so a later chdir cannot return another file's schedules
+    return _load_schedules(os.path.abspath(path))
+
+
+@lru_cache(maxsize=None)
+def _load_schedules(path: str) -> Mapping[Optional[str], Schedule]:
+    config = load_config_section("schedule", DEFAULT_SCHEDULE, path)
+    accounts = config.pop("accounts", {})
+
+    schedules: Dict[Optional[str], Schedule] = {None: _compile(config, "[schedule]")}
+    for name, account_config in accounts.items():
+        # Account keys replace the shared ones; their overrides and holidays add to them
+        merged = {**config, **account_config}
+        merged["weekdays"] = {
+            **config.get("weekdays", {}),
+            **account_config.get("weekdays", {}),
+        }
+        merged["overrides"] = account_config.get("overrides", []) + config.get(
+            "overrides", []
+        )
+        merged["holidays"] = account_config.get("holidays", []) + config.get(
+            "holidays", []
+        )
+        schedules[name] = _compile(merged, f"[schedule.accounts.{name}]")
+    return MappingProxyType(schedules)
+
+
+def _compile(config: Dict[str, Any], where: str) -> Schedule:
+    morning = _shift(config["normal_day_morning"], f"{where} normal_day_morning")
+    afternoon = _shift(config["normal_day_afternoon"], f"{where} normal_day_afternoon")
+    friday = _shift(config["friday_continuous"], f"{where} friday_continuous")
+
+    week: List[Shifts] = [(morning, afternoon)] * 4 + [(friday,), (), ()]
+    for index, shifts in enumerate(_week(config.get("weekdays", {}), where)):
+        if shifts is not None:
+            week[index] = shifts
+
+    overrides = []
+    for i, override in enumerate(config.get("overrides", [])):
+        label = f"{where} overrides[{i}]"
+        start = _date(override.get("start"), f"{label} start")
+        end = _date(override.get("end"), f"{label} end")
+        if end < start:
+            raise ValueError(f"{label}: end {end} is before start {start}")
+        override_week = list(_week(override.get("weekdays", {}), label))
+        if "shifts" in override:
+            # Applies to every day that is a working day in the base week
+            shifts = _shifts(override["shifts"], f"{label} shifts")
+            override_week = [
+                shifts if week[index] and day is None else day
+                for index, day in enumerate(override_week)
+            ]
+        overrides.append(ScheduleOverride(start, end, tuple(override_week)))
+
+    holidays = frozenset(
+        _date(day, f"{where} holidays") for day in config.get("holidays", [])
+    )
+    return Schedule(tuple(week), tuple(overrides), holidays)
+
+
+def _week(weekdays: Dict[str, Any], where: str) -> WeekTable:
+    unknown = set(weekdays) - set(WEEKDAY_NAMES)
+    if unknown:
+        raise ValueError(f"{where}: unknown weekday(s) {', '.join(sorted(unknown))}")
+    return tuple(
+        _shifts(weekdays[name], f"{where} weekdays.{name}")
+        if name in weekdays
+        else None
+        for name in WEEKDAY_NAMES
+    )
+
+
+def _shifts(value: Any, where: str) -> Shifts:
+    if not isinstance(value, list):
+        raise ValueError(f"{where}: expected a list of [start, end] shifts")
+    shifts = tuple(_shift(shift, where) for shift in value)
+    if len(shifts) > MAX_SHIFTS_PER_DAY:
+        raise ValueError(
+            f"{where}: at most {MAX_SHIFTS_PER_DAY} shifts per day"
+            f" (a morning and an afternoon), got {len(shifts)}"
+        )
+    for previous, shift in zip(shifts, shifts[1:]):
+        if shift[0] < previous[1]:
+            raise ValueError(f"{where}: shifts overlap or are out of order")
+    return shifts
+
+
+def _shift(value: Any, where: str) -> Shift:
+    if (
+        not isinstance(value, list)
+        or len(value) != 2
+        or not all(isinstance(t, str) and TIME_PATTERN.match(t) for t in value)
+    ):
+        raise ValueError(f'{where}: expected ["HH:MM", "HH:MM"], got {value!r}')
+    start, end = value
+    if end <= start:
+        raise ValueError(f"{where}: shift {start}-{end} ends before it starts")
+    return (start, end)
+
+
+def _date(value: Any, where: str) -> date:
+    # TOML dates (start = 2025-07-01, unquoted) arrive parsed already
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: expected a YYYY-MM-DD date, got {value!r}") from None
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from src.constants import SELECTOR_FALLBACKS, SELECTOR_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class SelectorRegistry:
+    """
+    Resolves logical page elements through an ordered list of fallback selectors.
+
+    Factorial ships hashed class names that change on every redeploy. Each logical
+    element therefore has several strategies (classes, roles, data attributes,
+    structure). The strategy that matched last is cached on disk so later lookups
+    only query that one selector.
+    """
+
+    def __init__(
+        self,
+        strategies: Optional[Dict[str, List[str]]] = None,
+        cache_path: str = SELECTOR_CACHE_PATH,
+    ):
+        self.strategies = strategies if strategies is not None else SELECTOR_FALLBACKS
+        self.cache_path = cache_path
+        self._cache = self._load_cache()
+
+    def _load_cache(self) -> Dict[str, str]:
+        try:
+            with open(self.cache_path, "r") as f:
+                cached = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+        # Ignore entries whose strategy has since been removed from the registry
+        return {
+            name: selector
+            for name, selector in cached.items()
+            if selector in self.strategies.get(name, [])
+        }
+
+    def _save_cache(self):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._cache, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def _remember(self, name: str, selector: str):
+        if self._cache.get(name) == selector:
+            return
+        self._cache[name] = selector
+        try:
+            self._save_cache()
+        except OSError as e:
+            logger.warning("Could not persist selector cache (%s)", e)
+
+    def candidates(self, name: str) -> List[str]:
+        """Returns the strategies for an element, cached winner first."""
+        strategies = self.strategies[name]
+        cached = self._cache.get(name)
+        if cached:
+            return [cached] + [s for s in strategies if s != cached]
+        return list(strategies)
+
+    def get(self, name: str) -> str:
+        """Returns the preferred selector for an element without querying the page."""
+        return self.candidates(name)[0]
+
+    async def resolve(
+        self, page: Page, name: str, timeout: int = 5000, state: str = "attached"
+    ) -> str:
+        """
+        Returns the first strategy that matches an element on the page.
+
+        A cached winner is tried on its own first. If it is missing (or nothing is
+        cached yet) all strategies are queried together, so a stale strategy costs a
+        single timeout rather than one per fallback, and the most preferred one that
+        matches wins.
+        """
+        candidates = self.candidates(name)
+        cached = self._cache.get(name)
+
+        if cached:
+            try:
+                await page.wait_for_selector(cached, state=state, timeout=timeout)
+                return cached
+            except PlaywrightTimeoutError:
+                logger.warning(
+                    "Cached selector for '%s' is stale, trying fallbacks...", name
+                )
+                candidates = candidates[1:]
+
+        selector = await self._race(page, candidates, timeout, state)
+        if selector is None:
+            raise PlaywrightTimeoutError(
+                f"No selector strategy for '{name}' matched within {timeout}ms"
+            )
+
+        self._remember(name, selector)
+        return selector
+
+    async def _race(
+        self, page: Page, selectors: List[str], timeout: int, state: str
+    ) -> Optional[str]:
+        if not selectors:
+            return None
+
+        tasks = [
+            asyncio.ensure_future(
+                page.wait_for_selector(selector, state=state, timeout=timeout)
+            )
+            for selector in selectors
+        ]
+        try:
+            # All strategies run at once but are settled in preference order: a later
+            # strategy that matches first only wins once every earlier one has failed
+            for selector, task in zip(selectors, tasks):
+                await asyncio.wait([task])
+                if not task.cancelled() and task.exception() is None:
+                    return selector
+            return None
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # Mark failures of unused strategies as retrieved
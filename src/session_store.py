@@ -0,0 +1,174 @@
+import asyncio
+import fcntl
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import asynccontextmanager, closing
+from typing import Any, AsyncIterator, Dict, List, Optional
+from src.constants import SESSION_STORE_PATH, SESSION_COOKIE_DOMAIN
+
+# Playwright storage state: {"cookies": [...], "origins": [...]}
+StorageState = Dict[str, Any]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    account TEXT PRIMARY KEY,
+    storage_state TEXT NOT NULL,
+    expires_at REAL,
+    refreshed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at);
+"""
+
+# Account names end up in lock file names, so they must not contain path separators
+ACCOUNT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+def check_account_name(account: str) -> str:
+    """Returns the account name, or raises ValueError if it is not a safe slug."""
+    if not ACCOUNT_NAME_PATTERN.match(account):
+        raise ValueError(
+            f"Invalid account name {account!r}: use letters, digits, '.', '_' and '-'"
+        )
+    return account
+
+
+def session_expiry(state: StorageState) -> Optional[float]:
+    """Returns when the earliest Factorial session cookie expires, if it has an expiry."""
+    expiries = [
+        cookie["expires"]
+        for cookie in state.get("cookies", [])
+        if SESSION_COOKIE_DOMAIN in cookie.get("domain", "")
+        and "session" in cookie.get("name", "")
+        and cookie.get("expires", -1) > 0
+    ]
+    return min(expiries) if expiries else None
+
+
+class RunLockError(RuntimeError):
+    """Raised when another run for the same account holds the run lock."""
+
+
+class SessionStore:
+    """
+    Stores one Playwright storage state per account in SQLite.
+
+    Every write is a single transaction, so readers never see a half-written
+    session. Refreshing a session spans a browser round-trip, so callers hold
+    the per-account file lock from `lock()` while they validate and save.
+    """
+
+    def __init__(self, path: str = SESSION_STORE_PATH):
+        self.path = path
+        self.lock_dir = os.path.join(os.path.dirname(path) or ".", "locks")
+        os.makedirs(self.lock_dir, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        # WAL lets concurrent runs read while another one refreshes
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def load(self, account: str) -> Optional[StorageState]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT storage_state FROM sessions WHERE account = ?", (account,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, account: str, state: StorageState):
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)",
+                (account, json.dumps(state), session_expiry(state), time.time()),
+            )
+            conn.execute("COMMIT")
+
+    def refreshed_at(self, account: str) -> Optional[float]:
+        """Returns when the account's session was last saved, if it has one."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT refreshed_at FROM sessions WHERE account = ?", (account,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def delete(self, account: str):
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM sessions WHERE account = ?", (account,))
+
+    def import_file(self, account: str, path: str) -> Optional[StorageState]:
+        """Imports a storage state JSON file (e.g. the legacy data/auth.json)."""
+        try:
+            with open(path, "r") as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        self.save(account, state)
+        return state
+
+    def needs_refresh(self, within_seconds: float) -> List[str]:
+        """
+        Returns accounts whose session expires within the given window.
+
+        Sessions without an expiry are included once they have not been
+        refreshed for the same amount of time.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT account FROM sessions "
+                "WHERE expires_at < ? OR (expires_at IS NULL AND refreshed_at < ?) "
+                "ORDER BY expires_at",
+                (now + within_seconds, now - within_seconds),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    @asynccontextmanager
+    async def run_lock(self, account: str) -> AsyncIterator[None]:
+        """
+        Marks a run for the account as in progress, across processes.
+
+        Unlike `lock()` this does not wait: a second run for the same account
+        raises RunLockError so that overlapping schedulers never write the same
+        days twice. The lock is released by the OS if the holder dies.
+        """
+        path = self._lock_path("run", account)
+        with open(path, "a+") as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.seek(0)
+                holder = f.read().strip() or "unknown"
+                raise RunLockError(
+                    f"Another run for account '{account}' is in progress (pid {holder})"
+                ) from None
+            f.seek(0)
+            f.truncate()
+            f.write(str(os.getpid()))
+            f.flush()
+            try:
+                yield
+            finally:
+                f.seek(0)
+                f.truncate()
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    @asynccontextmanager
+    async def lock(self, account: str) -> AsyncIterator[None]:
+        """Holds an exclusive per-account file lock, shared across processes."""
+        path = self._lock_path("session", account)
+        with open(path, "w") as f:
+            # flock blocks, so wait in a thread to keep the event loop responsive
+            await asyncio.to_thread(fcntl.flock, f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _lock_path(self, kind: str, account: str) -> str:
+        return os.path.join(self.lock_dir, f"{kind}-{check_account_name(account)}.lock")
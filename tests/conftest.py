@@ -0,0 +1,19 @@
+import pytest
+from src.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def anyio_backend():
+    """
+    Runs async tests on asyncio only: the bot, limiter, selector registry and
+    daemon are written against asyncio (asyncio.wait, to_thread, sleep).
+    """
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiters():
+    """Keeps token buckets and backoffs from leaking between tests."""
+    RateLimiter.reset()
+    yield
+    RateLimiter.reset()
@@ -0,0 +1,399 @@
+"""
+In-process fakes for the parts of Playwright's Page and Locator API that
+Navigator and FactorialBot use.
+
+FakeFactorial holds the "server" state (time-off calendar and logged
+shifts); FakePage renders it the way the real pages do for the selectors in
+src.constants. Every awaited call counts as one browser round-trip in
+`FakePage.calls` and can be delayed with `latency`, so tests can assert how
+many round-trips a flow takes.
+"""
+
+import asyncio
+import calendar
+import re
+from collections import Counter
+from datetime import date
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from src.bot import SPANISH_MONTHS
+from src.constants import (
+    COLOR_BAJA,
+    COLOR_OTRO,
+    COLOR_VACACIONES,
+    SELECTOR_ATTENDANCE_ROW,
+    SELECTOR_FALLBACKS,
+    SELECTOR_MODAL_CONTENT_WRAPPER,
+    SELECTOR_MODAL_INPUT_TIME,
+    SELECTOR_TIMEOFF_DAY_CELL,
+    SELECTOR_TIMEOFF_HOLIDAY_CELL,
+    URL_ATTENDANCE_BASE,
+    URL_TIMEOFF,
+)
+from src.rate_limiter import RateLimiter
+from src.reconciliation import shift_minutes
+
+# Captured before tests patch asyncio.sleep to skip the bot's UI pauses
+_sleep = asyncio.sleep
+
+ROW_TOGGLE = '[data-intercom-target="attendance-row-toggle"]'
+ADD_SHIFT_BUTTON = '[data-intercom-target="attendance-row-add-shift-button"]'
+APPLY_BUTTON = "//button[normalize-space(.)='Aplicar']"
+NEXT_ROW = "xpath=./following-sibling::tr[1]"
+HALF_DAY_SPANS = {
+    "span:has-text('1er mitad del día')": "half_morning",
+    "span:has-text('2da mitad del día')": "half_afternoon",
+}
+REASON_COLORS = {
+    "vacation": COLOR_VACACIONES,
+    "sick_leave": COLOR_BAJA,
+    "other": COLOR_OTRO,
+}
+MONTH_NAMES = {number: name for name, number in SPANISH_MONTHS.items()}
+WEEKDAY_ABBREVIATIONS = ("lun.", "mar.", "mié.", "jue.", "vie.", "sáb.", "dom.")
+
+TEXT_SUFFIX = re.compile(r"^(.*):text\('(.*)'\)$")
+TEXT_MATCHES_SUFFIX = re.compile(r"^(.*):text-matches\('\^(.*)\$'\)$")
+ATTENDANCE_URL = re.compile(re.escape(URL_ATTENDANCE_BASE) + r"/(\d+)/(\d+)/1$")
+
+
+def unthrottled_limiter() -> RateLimiter:
+    """A limiter that never waits, so fake navigations are not paced."""
+    return RateLimiter.unthrottled("fake")
+
+
+class FakeFactorial:
+    """Server-side state shared by every FakePage looking at it."""
+
+    def __init__(self, calendar_year: int):
+        # The time-off calendar shows a single year, like the real one
+        self.calendar_year = calendar_year
+        # date -> (reason, type); reasons as in FactorialBot.detect_absences
+        self.absences: Dict[date, Tuple[str, str]] = {}
+        self.shifts: Dict[date, List[Tuple[str, str]]] = {}
+        # Days whose shifts the page shows as applied but the server never saves
+        self.rejected: Set[date] = set()
+
+    def add_absence(self, day: date, reason: str = "vacation", kind: str = "full"):
+        self.absences[day] = (reason, kind)
+
+    def minutes(self, day: date) -> int:
+        return shift_minutes(self.shifts.get(day, []))
+
+
+class Node:
+    """An element on a fake page, identified by its kind and the day it belongs to."""
+
+    __slots__ = ("kind", "day", "index")
+
+    def __init__(self, kind: str, day: Optional[date] = None, index: int = 0):
+        self.kind = kind
+        self.day = day
+        self.index = index
+
+
+class FakeKeyboard:
+    def __init__(self, page: "FakePage"):
+        self.page = page
+
+    async def press(self, key: str):
+        await self.page._round_trip("keyboard.press")
+        if key == "Escape":
+            self.page.timeoff_modal = None
+            self.page.shift_modal = None
+
+
+class FakeLocator:
+    """A lazy query, resolved against the page's current state on each call."""
+
+    def __init__(self, page: "FakePage", resolve: Callable[[], List[Node]]):
+        self.page = page
+        self._resolve = resolve
+
+    def locator(self, selector: str) -> "FakeLocator":
+        return FakeLocator(
+            self.page,
+            lambda: [
+                child
+                for node in self._resolve()
+                for child in self.page._children(node, selector)
+            ],
+        )
+
+    def nth(self, index: int) -> "FakeLocator":
+        def pick() -> List[Node]:
+            nodes = self._resolve()
+            return [nodes[index]] if -len(nodes) <= index < len(nodes) else []
+
+        return FakeLocator(self.page, pick)
+
+    @property
+    def first(self) -> "FakeLocator":
+        return self.nth(0)
+
+    @property
+    def last(self) -> "FakeLocator":
+        return self.nth(-1)
+
+    def _single(self) -> Node:
+        nodes = self._resolve()
+        if not nodes:
+            raise PlaywrightTimeoutError("Timeout: no element matches the locator")
+        if len(nodes) > 1:
+            raise PlaywrightError(f"strict mode violation: {len(nodes)} elements")
+        return nodes[0]
+
+    async def count(self) -> int:
+        await self.page._round_trip("count")
+        return len(self._resolve())
+
+    async def text_content(self) -> str:
+        await self.page._round_trip("text_content")
+        return self.page._text(self._single())
+
+    async def all_text_contents(self) -> List[str]:
+        await self.page._round_trip("all_text_contents")
+        return [self.page._text(node) for node in self._resolve()]
+
+    async def get_attribute(self, name: str) -> Optional[str]:
+        await self.page._round_trip("get_attribute")
+        return self.page._attribute(self._single(), name)
+
+    async def is_visible(self) -> bool:
+        await self.page._round_trip("is_visible")
+        return bool(self._resolve())
+
+    async def wait_for(self, state: str = "visible", timeout: float = 30000):
+        await self.page._round_trip("wait_for")
+        if not self._resolve():
+            raise PlaywrightTimeoutError(f"Timeout {timeout}ms waiting for locator")
+
+    async def scroll_into_view_if_needed(self):
+        await self.page._round_trip("scroll_into_view_if_needed")
+        self._single()
+
+    async def click(self):
+        await self.page._round_trip("click")
+        self.page._click(self._single())
+
+    async def fill(self, value: str):
+        await self.page._round_trip("fill")
+        node = self._single()
+        if node.kind != "time_input":
+            raise PlaywrightError("Element is not an <input>")
+        self.page.shift_modal[node.index] = value
+
+
+class FakePage:
+    """
+    Renders a FakeFactorial through the selectors the bot uses.
+
+    UI state (expanded rows, open modals) belongs to the page and is reset
+    by goto(). Like a real browser, the page shows the shifts as they were
+    when it was loaded plus its own writes, so two pages on the same model
+    behave like two browsers on the same account.
+    """
+
+    def __init__(self, model: FakeFactorial, latency: float = 0.0):
+        self.model = model
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self.url = "about:blank"
+        self.keyboard = FakeKeyboard(self)
+        self.expanded: Set[date] = set()
+        self.shown: Dict[date, List[Tuple[str, str]]] = {}
+        self.timeoff_modal: Optional[date] = None
+        # Values of the two time inputs while the add-shift modal is open
+        self.shift_modal: Optional[List[str]] = None
+        self.shift_modal_day: Optional[date] = None
+
+    @property
+    def round_trips(self) -> int:
+        return sum(self.calls.values())
+
+    async def _round_trip(self, name: str):
+        self.calls[name] += 1
+        if self.latency:
+            await _sleep(self.latency)
+
+    # --- Page API ---
+
+    async def goto(self, url: str):
+        await self._round_trip("goto")
+        self.url = url
+        self.shown = {day: list(shifts) for day, shifts in self.model.shifts.items()}
+        self.expanded.clear()
+        self.timeoff_modal = None
+        self.shift_modal = None
+
+    async def wait_for_load_state(self, state: str = "load"):
+        await self._round_trip("wait_for_load_state")
+
+    async def route(self, pattern: str, handler):
+        await self._round_trip("route")
+
+    def locator(self, selector: str) -> FakeLocator:
+        return FakeLocator(self, lambda: self._children(Node("page"), selector))
+
+    async def wait_for_selector(
+        self, selector: str, state: str = "visible", timeout: float = 30000
+    ):
+        await self._round_trip("wait_for_selector")
+        if not self._children(Node("page"), selector):
+            raise PlaywrightTimeoutError(f"Timeout {timeout}ms waiting for {selector}")
+        return self.locator(selector)
+
+    async def is_visible(self, selector: str) -> bool:
+        await self._round_trip("is_visible")
+        return bool(self._children(Node("page"), selector))
+
+    async def content(self) -> str:
+        await self._round_trip("content")
+        rows = "".join(
+            f"<tr>{self._text(node)}</tr>"
+            for node in self._children(Node("page"), SELECTOR_ATTENDANCE_ROW)
+        )
+        return f"<html><body data-url='{self.url}'><table>{rows}</table></body></html>"
+
+    async def screenshot(self, **kwargs) -> bytes:
+        await self._round_trip("screenshot")
+        return b""
+
+    # --- Rendering ---
+
+    def _attendance_month(self) -> Optional[Tuple[int, int]]:
+        match = ATTENDANCE_URL.match(self.url)
+        return (int(match.group(1)), int(match.group(2))) if match else None
+
+    def _children(self, node: Node, selector: str) -> List[Node]:
+        """Elements under `node` matching `selector`; unknown ones match nothing."""
+        on_timeoff = self.url == URL_TIMEOFF
+
+        if node.kind == "page":
+            if on_timeoff and selector in SELECTOR_FALLBACKS["timeoff_calendar"]:
+                return [Node("calendar")]
+            text = TEXT_SUFFIX.match(selector)
+            if (
+                on_timeoff
+                and text
+                and text.group(1) in SELECTOR_FALLBACKS["timeoff_month_name"]
+            ):
+                month = SPANISH_MONTHS.get(text.group(2))
+                return [Node("month", index=month)] if month else []
+            if on_timeoff and selector in SELECTOR_FALLBACKS["timeoff_month_name"]:
+                return [Node("month", index=month) for month in range(1, 13)]
+            if selector in SELECTOR_FALLBACKS["timeoff_modal_body"]:
+                if self.timeoff_modal is None:
+                    return []
+                return [Node("timeoff_modal", self.timeoff_modal)]
+            if selector == SELECTOR_ATTENDANCE_ROW:
+                return self._rows()
+            if selector == SELECTOR_MODAL_CONTENT_WRAPPER:
+                if self.shift_modal is None:
+                    return []
+                return [Node("shift_modal", self.shift_modal_day)]
+            return []
+
+        if node.kind == "month" and selector == "xpath=..":
+            return [Node("month_container", index=node.index)]
+
+        if node.kind == "month_container":
+            cell = TEXT_MATCHES_SUFFIX.match(selector)
+            if cell and cell.group(1) in (
+                SELECTOR_TIMEOFF_DAY_CELL,
+                SELECTOR_TIMEOFF_HOLIDAY_CELL,
+            ):
+                year, month = self.model.calendar_year, node.index
+                day = int(cell.group(2))
+                if day > calendar.monthrange(year, month)[1]:
+                    return []
+                day_cell = date(year, month, day)
+                reason, _ = self.model.absences.get(day_cell, (None, None))
+                if cell.group(1) == SELECTOR_TIMEOFF_HOLIDAY_CELL and reason != "holiday":
+                    return []
+                return [Node("day_cell", day_cell)]
+            return []
+
+        if node.kind == "timeoff_modal" and selector in HALF_DAY_SPANS:
+            _, kind = self.model.absences.get(node.day, (None, "full"))
+            return [Node("span", node.day)] if kind == HALF_DAY_SPANS[selector] else []
+
+        if node.kind == "row":
+            if selector == ROW_TOGGLE:
+                return [Node("toggle", node.day)]
+            if selector == NEXT_ROW:
+                rows = self._rows()
+                position = next(
+                    i
+                    for i, row in enumerate(rows)
+                    if row.kind == "row" and row.day == node.day
+                )
+                return rows[position + 1 : position + 2]
+            return []
+
+        if node.kind == "shifts" and selector == ADD_SHIFT_BUTTON:
+            return [Node("add_shift", node.day)]
+
+        if node.kind == "shift_modal":
+            if selector == SELECTOR_MODAL_INPUT_TIME:
+                return [Node("time_input", node.day, i) for i in range(2)]
+            if selector == APPLY_BUTTON:
+                return [Node("apply", node.day)]
+
+        return []
+
+    def _rows(self) -> List[Node]:
+        month = self._attendance_month()
+        if month is None:
+            return []
+        year, month = month
+        rows = []
+        for day_number in range(1, calendar.monthrange(year, month)[1] + 1):
+            day = date(year, month, day_number)
+            rows.append(Node("row", day))
+            if day in self.expanded:
+                # Expanding a day inserts its shifts as the next table row
+                rows.append(Node("shifts", day))
+        return rows
+
+    def _text(self, node: Node) -> str:
+        if node.kind == "row":
+            minutes = shift_minutes(self.shown.get(node.day, []))
+            return (
+                f"{node.day.day} {WEEKDAY_ABBREVIATIONS[node.day.weekday()]} "
+                f"{minutes // 60}h {minutes % 60:02d}m"
+            )
+        if node.kind == "shifts":
+            shifts = self.shown.get(node.day, [])
+            return " ".join([f"{start} - {end}" for start, end in shifts] + ["Añadir"])
+        if node.kind == "month":
+            return MONTH_NAMES[node.index]
+        if node.kind == "day_cell":
+            return str(node.day.day)
+        return ""
+
+    def _attribute(self, node: Node, name: str) -> Optional[str]:
+        if node.kind != "day_cell":
+            return None
+        reason, _ = self.model.absences.get(node.day, (None, None))
+        if name == "style" and reason in REASON_COLORS:
+            return f"background-color: {REASON_COLORS[reason]};"
+        if name == "class":
+            return "htytoi" if reason == "holiday" else "htytoa"
+        return None
+
+    def _click(self, node: Node):
+        if node.kind == "toggle":
+            self.expanded ^= {node.day}
+        elif node.kind == "day_cell":
+            self.timeoff_modal = node.day
+        elif node.kind == "add_shift":
+            self.shift_modal = ["", ""]
+            self.shift_modal_day = node.day
+        elif node.kind == "apply":
+            shift = tuple(self.shift_modal)
+            if node.day not in self.model.rejected:
+                self.model.shifts.setdefault(node.day, []).append(shift)
+            self.shown.setdefault(node.day, []).append(shift)
+            self.shift_modal = None
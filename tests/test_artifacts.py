@@ -0,0 +1,67 @@
+import gzip
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.artifacts import ArtifactCollector
+
+pytestmark = pytest.mark.anyio
+
+
+def make_page(html="<html><body>calendar</body></html>"):
+    page = MagicMock()
+    page.content = AsyncMock(return_value=html)
+    page.screenshot = AsyncMock(return_value=b"\xff\xd8jpeg")
+    return page
+
+
+async def test_capture_writes_gzipped_snapshot(tmp_path):
+    collector = ArtifactCollector("alice", directory=str(tmp_path))
+    page = make_page()
+
+    path = await collector.capture(page, "fill-2025-05-08")
+
+    assert os.path.basename(path) == "001-fill-2025-05-08.html.gz"
+    with gzip.open(path, "rt") as f:
+        assert "calendar" in f.read()
+    page.screenshot.assert_not_called()
+
+
+async def test_capture_adds_viewport_screenshot_when_enabled(tmp_path):
+    collector = ArtifactCollector("alice", directory=str(tmp_path), screenshot=True)
+    page = make_page()
+
+    path = await collector.capture(page, "login")
+
+    page.screenshot.assert_awaited_once_with(type="jpeg", quality=40, full_page=False)
+    assert os.path.exists(path.replace(".html.gz", ".jpg"))
+
+
+async def test_capture_stops_at_run_budget(tmp_path):
+    """Tests that a run never writes more than its budget."""
+    collector = ArtifactCollector("alice", directory=str(tmp_path), run_budget_kb=1)
+    page = make_page(os.urandom(600).hex())
+
+    assert await collector.capture(page, "first") is not None
+    assert await collector.capture(page, "second") is None
+    assert collector.used_bytes <= 1024
+
+
+async def test_old_runs_are_rotated(tmp_path):
+    for run in ("20250101-000000-000000", "20250102-000000-000000"):
+        os.makedirs(tmp_path / "alice" / run)
+    collector = ArtifactCollector("alice", directory=str(tmp_path), max_runs=2)
+
+    await collector.capture(make_page(), "bot")
+
+    runs = sorted(os.listdir(tmp_path / "alice"))
+    assert len(runs) == 2
+    assert "20250101-000000-000000" not in runs
+
+
+async def test_capture_never_raises(tmp_path):
+    collector = ArtifactCollector("alice", directory=str(tmp_path))
+    page = MagicMock()
+    page.content = AsyncMock(side_effect=RuntimeError("page crashed"))
+
+    assert await collector.capture(page, "bot") is None
+    assert await collector.capture(None, "bot") is None
@@ -0,0 +1,96 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.benchmark import benchmark_engine, format_table, summarize
+from src.browser import LaunchProfile
+from src.rate_limiter import RateLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+@patch("src.benchmark.FactorialBot")
+async def test_benchmark_engine_runs_dry_run_flow(MockFactorialBot):
+    """Tests that one benchmark run launches the engine and runs the bot in dry-run mode."""
+    playwright = MagicMock()
+    browser = playwright.firefox.launch = AsyncMock()
+    browser.return_value.new_context = AsyncMock()
+    MockFactorialBot.return_value.run = AsyncMock()
+
+    result = await benchmark_engine(
+        playwright, LaunchProfile("default", engine="firefox"), {"cookies": []}
+    )
+
+    assert result["engine"] == "firefox"
+    assert result["success"] is True
+    assert "launch_seconds" in result
+    assert MockFactorialBot.call_args.kwargs["dry_run"] is True
+    browser.return_value.close.assert_awaited_once()
+
+
+@patch("src.benchmark.FactorialBot")
+async def test_benchmark_runs_do_not_share_caches(MockFactorialBot):
+    """Tests that each run gets its own selector cache and rate limiter."""
+    playwright = MagicMock()
+    playwright.chromium.launch = AsyncMock()
+    playwright.chromium.launch.return_value.new_context = AsyncMock()
+    MockFactorialBot.return_value.run = AsyncMock()
+    profile = LaunchProfile("default")
+
+    await benchmark_engine(playwright, profile, {"cookies": []})
+    await benchmark_engine(playwright, profile, {"cookies": []})
+
+    first, second = (call.kwargs for call in MockFactorialBot.call_args_list)
+    assert first["selectors"].cache_path != second["selectors"].cache_path
+    assert first["limiter"] is not second["limiter"]
+    assert first["limiter"] is not RateLimiter.for_tenant()
+    # Live runs are still paced and retried like the tenant's shared limiter
+    assert first["limiter"].max_retries == RateLimiter.for_tenant().max_retries
+    assert first["artifacts"].enabled is False
+
+
+@patch("src.benchmark.route_from_har", new_callable=AsyncMock)
+@patch("src.benchmark.FactorialBot")
+async def test_benchmark_replay_is_unthrottled(MockFactorialBot, _route_from_har):
+    """Tests that replayed runs, which never reach the tenant, are not paced."""
+    playwright = MagicMock()
+    playwright.chromium.launch = AsyncMock()
+    playwright.chromium.launch.return_value.new_context = AsyncMock()
+    MockFactorialBot.return_value.run = AsyncMock()
+
+    await benchmark_engine(
+        playwright, LaunchProfile("default"), {"cookies": []}, replay=True
+    )
+
+    limiter = MockFactorialBot.call_args.kwargs["limiter"]
+    assert limiter.max_retries == 0
+    assert limiter.bucket.rate == 1e9
+
+
+async def test_benchmark_engine_reports_launch_failure():
+    """Tests that an engine that cannot start is reported rather than raised."""
+    playwright = MagicMock()
+    playwright.webkit.launch = AsyncMock(side_effect=RuntimeError("not installed"))
+
+    result = await benchmark_engine(
+        playwright, LaunchProfile("default", engine="webkit"), {"cookies": []}
+    )
+
+    assert result == {"engine": "webkit", "success": False, "error": "not installed"}
+
+
+def test_summarize_takes_medians_of_successful_runs():
+    runs = [
+        {"engine": "chromium", "success": True, "launch_seconds": 1.0,
+         "phases": {"absences": 2.0, "attendance": 4.0}, "peak_rss_bytes": 100},
+        {"engine": "chromium", "success": True, "launch_seconds": 3.0,
+         "phases": {"absences": 4.0, "attendance": 6.0}, "peak_rss_bytes": 300},
+        {"engine": "chromium", "success": False, "error": "timeout"},
+    ]
+
+    summary = summarize(runs)
+
+    assert summary["runs"] == 3
+    assert summary["failures"] == 1
+    assert summary["launch_seconds"] == 2.0
+    assert summary["phases"] == {"absences": 3.0, "attendance": 5.0}
+    assert summary["peak_rss_bytes"] == 200
+    assert "chromium" in format_table([summary])
@@ -1,8 +1,13 @@
+import time
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
-from datetime import datetime
+from datetime import date, datetime
+from src.artifacts import ArtifactCollector
 from src.bot import FactorialBot, AbsenceInfo
+from src.schedule import get_schedule
+from src.selector_registry import SelectorRegistry
 from src.constants import *
+from tests.fakes import FakeFactorial, FakePage, unthrottled_limiter
 
 # Mark all tests in this module as asyncio
 pytestmark = pytest.mark.anyio
@@ -25,160 +30,178 @@ def mock_page():
 @pytest.fixture
 def bot(mock_page):
     """Provides a FactorialBot instance with a mock page."""
-    return FactorialBot(mock_page, dry_run=False)
+    return FactorialBot(mock_page, dry_run=False, limiter=unthrottled_limiter())
+
+
+@pytest.fixture
+def factorial():
+    """Provides an empty in-memory Factorial for 2025."""
+    return FakeFactorial(calendar_year=2025)
+
+
+@pytest.fixture
+def fake_page(factorial):
+    return FakePage(factorial)
+
+
+@pytest.fixture
+def fake_bot(fake_page, tmp_path, monkeypatch):
+    """
+    Provides a FactorialBot driving a FakePage, with the UI pauses skipped and
+    every file it writes kept in tmp_path.
+    """
+    (tmp_path / "config.toml").write_text(
+        '[schedule]\nnormal_day_morning = ["08:30", "14:00"]\n'
+        'normal_day_afternoon = ["15:00", "18:00"]\n'
+        'friday_continuous = ["08:30", "15:00"]\n'
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("src.bot.asyncio.sleep", AsyncMock())
+    bot = FactorialBot(
+        fake_page,
+        dry_run=False,
+        selectors=SelectorRegistry(cache_path=str(tmp_path / "selectors.json")),
+        artifacts=ArtifactCollector(enabled=False),
+        schedule=get_schedule(path=str(tmp_path / "config.toml")),
+        limiter=unthrottled_limiter(),
+    )
+    return bot
 
 
 # --- Tests for _fill_hours_for_day ---
 
 
-async def test_fill_hours_for_normal_day(bot, mock_page):
+async def test_fill_hours_for_normal_day(fake_bot, fake_page, factorial):
     """
-    Tests that _fill_hours_for_day tries to fill two shifts for a normal workday.
+    Tests that _fill_hours_for_day fills two shifts for a normal workday.
     """
-    date = datetime(2025, 10, 13)  # A Monday
-    target_row = AsyncMock()
+    day = date(2025, 10, 13)  # A Monday
+    await fake_page.goto(f"{URL_ATTENDANCE_BASE}/2025/10/1")
+    target_row = await fake_bot._find_row(day.day)
 
-    # --- Mocks for UI elements ---
-    # 1. The 'Añadir' button that is ultimately clicked
-    add_button_mock = AsyncMock()
-    add_button_mock.scroll_into_view_if_needed = AsyncMock()
-    add_button_mock.click = AsyncMock()
+    filled = await fake_bot._fill_hours_for_day(
+        datetime(2025, 10, 13), absence_info=None, target_row=target_row
+    )
 
-    # 2. The locator for the 'Añadir' button
-    add_shift_locator_mock = AsyncMock()
-    add_shift_locator_mock.first = add_button_mock
-    add_shift_locator_mock.wait_for = AsyncMock()
+    assert filled is True
+    assert factorial.shifts[day] == [("08:30", "14:00"), ("15:00", "18:00")]
+    # Per shift: add, 2 inputs, apply; plus expanding the row
+    assert fake_page.calls["click"] == 1 + 2 * 2
+    assert fake_page.calls["fill"] == 4
 
-    # 3. The container for the shifts section (the expanded row)
-    shifts_container_mock = AsyncMock()
-    shifts_container_mock.locator = MagicMock(return_value=add_shift_locator_mock)
 
-    # 4. The toggle button on the main row
-    toggle_button_mock = AsyncMock()
-    toggle_button_mock.click = AsyncMock()
-
-    # 5. Configure the target_row mock to return the right locator for each call
-    def target_row_locator_router(selector):
-        if "following-sibling" in selector:
-            return shifts_container_mock
-        if "attendance-row-toggle" in selector:
-            return toggle_button_mock
-        return AsyncMock()
-
-    target_row.locator = MagicMock(side_effect=target_row_locator_router)
-
-    # 6. Mocks for the modal that appears after clicking 'Añadir'
-    inputs_locator = AsyncMock()
-    inputs_locator.count = AsyncMock(return_value=2)
-    # nth() is a sync method returning a locator, whose fill() method is async
-    nth_locator_mock = AsyncMock()
-    nth_locator_mock.fill = AsyncMock()
-    inputs_locator.nth = MagicMock(return_value=nth_locator_mock)
-
-    apply_button_locator = AsyncMock()
-    apply_button_locator.click = AsyncMock()
-
-    modal_wrapper_locator = AsyncMock()
-    # The locator is called for inputs and then for the apply button, for each shift.
-    modal_wrapper_locator.locator = MagicMock(
-        side_effect=[
-            inputs_locator,
-            apply_button_locator,
-            inputs_locator,
-            apply_button_locator,
-        ]
+async def test_fill_hours_for_friday(fake_bot, fake_page, factorial):
+    """
+    Tests that _fill_hours_for_day fills one continuous shift on a Friday,
+    even with a half-day absence.
+    """
+    day = date(2025, 10, 17)  # A Friday
+    await fake_page.goto(f"{URL_ATTENDANCE_BASE}/2025/10/1")
+    target_row = await fake_bot._find_row(day.day)
+
+    filled = await fake_bot._fill_hours_for_day(
+        datetime(2025, 10, 17),
+        absence_info={"type": "half_morning", "reason": "vacation"},
+        target_row=target_row,
     )
 
-    # self.page.locator(...).last
-    page_level_locator = AsyncMock()
-    page_level_locator.last = modal_wrapper_locator
-    mock_page.locator.return_value = page_level_locator
-    bot.nav.wait_for_selector = AsyncMock()
+    assert filled is True
+    assert factorial.shifts[day] == [("08:30", "15:00")]
+    assert fake_page.calls["fill"] == 2
 
-    # --- Run ---
-    await bot._fill_hours_for_day(date, absence_info=None, target_row=target_row)
 
-    # --- Assertions ---
-    # It should toggle the row open
-    toggle_button_mock.click.assert_awaited_once()
-    # It should click the 'add' button twice
-    assert add_button_mock.click.await_count == 2
-    # It should fill 4 inputs (start/end for 2 shifts)
-    assert inputs_locator.nth.return_value.fill.await_count == 4
-    # It should click 'apply' twice
-    assert apply_button_locator.click.await_count == 2
+async def test_run_fills_range_against_fake_factorial(fake_bot, fake_page, factorial):
+    """
+    Tests a whole run: absences are honoured, filled days are left alone and
+    each month is reconciled with a single read of the table.
+    """
+    factorial.add_absence(date(2025, 10, 6), "vacation")
+    factorial.add_absence(date(2025, 10, 7), "sick_leave", "half_morning")
+    factorial.add_absence(date(2025, 10, 8), "holiday")
+    factorial.shifts[date(2025, 10, 9)] = [("09:00", "17:00")]
+
+    await fake_bot.run(today=datetime(2025, 10, 15))
+
+    assert date(2025, 10, 6) not in factorial.shifts
+    assert factorial.shifts[date(2025, 10, 7)] == [("15:00", "18:00")]
+    assert date(2025, 10, 8) not in factorial.shifts
+    assert factorial.shifts[date(2025, 10, 9)] == [("09:00", "17:00")]
+    assert factorial.shifts[date(2025, 9, 19)] == [("08:30", "15:00")]
+    assert date(2025, 9, 20) not in factorial.shifts
+    assert fake_bot.metrics.days == {"filled": 19, "skipped": 3, "failed": 0}
+    # Time-off page, two attendance months, then per month one reload before its
+    # first write and one before it is reconciled
+    assert fake_page.calls["goto"] == 1 + 2 + 2 + 2
+    assert fake_page.calls["all_text_contents"] == 2
+
+
+async def test_reconciliation_reads_saved_hours_not_the_edited_page(
+    fake_bot, factorial
+):
+    """
+    Tests that a shift the page showed as applied but the server dropped is
+    reported for retry.
+    """
+    factorial.rejected.add(date(2025, 10, 13))
+
+    report = await fake_bot.process_attendance(
+        datetime(2025, 10, 13), datetime(2025, 10, 14), absences={}
+    )
 
-    fill_calls = inputs_locator.nth.return_value.fill.await_args_list
-    assert fill_calls[0].args[0] == "08:30"
-    assert fill_calls[1].args[0] == "14:00"
-    assert fill_calls[2].args[0] == "15:00"
-    assert fill_calls[3].args[0] == "18:00"
+    assert date(2025, 10, 13) not in factorial.shifts
+    assert [(e["date"], e["status"]) for e in report.entries] == [
+        ("2025-10-13", "retry"),
+        ("2025-10-14", "ok"),
+    ]
 
 
-async def test_fill_hours_for_friday(bot, mock_page):
+async def test_second_run_writes_nothing(fake_bot, fake_page, factorial):
     """
-    Tests that _fill_hours_for_day tries to fill one shift for a Friday.
+    Tests that running again over the same range adds no shifts.
     """
-    date = datetime(2025, 10, 17)  # A Friday
-    target_row = AsyncMock()
+    await fake_bot.run(today=datetime(2025, 10, 15))
+    logged = {day: list(shifts) for day, shifts in factorial.shifts.items()}
+    fake_page.calls.clear()
 
-    # --- Mocks for UI elements ---
-    add_button_mock = AsyncMock()
-    add_button_mock.scroll_into_view_if_needed = AsyncMock()
-    add_button_mock.click = AsyncMock()
+    await fake_bot.run(today=datetime(2025, 10, 15))
 
-    add_shift_locator_mock = AsyncMock()
-    add_shift_locator_mock.first = add_button_mock
-    add_shift_locator_mock.wait_for = AsyncMock()
+    assert factorial.shifts == logged
+    assert fake_page.calls["click"] == 0
+    assert fake_page.calls["goto"] == 1 + 2
 
-    shifts_container_mock = AsyncMock()
-    shifts_container_mock.locator = MagicMock(return_value=add_shift_locator_mock)
 
-    toggle_button_mock = AsyncMock()
-    toggle_button_mock.click = AsyncMock()
-
-    def target_row_locator_router(selector):
-        if "following-sibling" in selector:
-            return shifts_container_mock
-        if "attendance-row-toggle" in selector:
-            return toggle_button_mock
-        return AsyncMock()
-
-    target_row.locator = MagicMock(side_effect=target_row_locator_router)
-
-    # Mocks for the modal
-    inputs_locator = AsyncMock()
-    inputs_locator.count = AsyncMock(return_value=2)
-    # nth() is a sync method returning a locator, whose fill() method is async
-    nth_locator_mock = AsyncMock()
-    nth_locator_mock.fill = AsyncMock()
-    inputs_locator.nth = MagicMock(return_value=nth_locator_mock)
-
-    apply_button_locator = AsyncMock()
-    apply_button_locator.click = AsyncMock()
-
-    modal_wrapper_locator = AsyncMock()
-    modal_wrapper_locator.locator = MagicMock(
-        side_effect=[inputs_locator, apply_button_locator]
+async def test_day_filled_by_another_browser_is_not_booked_twice(
+    fake_bot, fake_page, factorial
+):
+    """
+    Tests that a day written from another browser after the month was loaded
+    is caught by the reload before writing.
+    """
+    await fake_page.goto(f"{URL_ATTENDANCE_BASE}/2025/10/1")
+    monday = date(2025, 10, 13)
+    # Saved by another run once this page has loaded
+    factorial.shifts[monday] = [("09:00", "17:00")]
+
+    # This page still shows the day empty until it reloads
+    assert "0h 00m" in await (await fake_bot._find_row(monday.day)).text_content()
+
+    await fake_bot.process_attendance(
+        datetime(2025, 10, 13), datetime(2025, 10, 13), absences={}
     )
 
-    page_level_locator = AsyncMock()
-    page_level_locator.last = modal_wrapper_locator
-    mock_page.locator.return_value = page_level_locator
-    bot.nav.wait_for_selector = AsyncMock()
+    assert factorial.shifts[monday] == [("09:00", "17:00")]
 
-    # --- Run ---
-    await bot._fill_hours_for_day(date, absence_info=None, target_row=target_row)
 
-    # --- Assertions ---
-    toggle_button_mock.click.assert_awaited_once()
-    assert add_button_mock.click.await_count == 1
-    assert inputs_locator.nth.return_value.fill.await_count == 2
-    assert apply_button_locator.click.await_count == 1
+async def test_fake_page_latency_is_per_round_trip(factorial):
+    page = FakePage(factorial, latency=0.01)
+    await page.goto(f"{URL_ATTENDANCE_BASE}/2025/10/1")
 
-    fill_calls = inputs_locator.nth.return_value.fill.await_args_list
-    assert fill_calls[0].args[0] == "08:30"
-    assert fill_calls[1].args[0] == "15:00"
+    start = time.monotonic()
+    await page.locator(SELECTOR_ATTENDANCE_ROW).count()
+    await page.locator(SELECTOR_ATTENDANCE_ROW).first.text_content()
+
+    assert time.monotonic() - start >= 0.02
+    assert page.round_trips == 3
 
 
 # --- Previous tests from test_bot.py ---
@@ -187,7 +210,7 @@ async def test_fill_hours_for_friday(bot, mock_page):
 @pytest.fixture
 def dry_run_bot(mock_page):
     """Provides a FactorialBot instance with dry_run=True."""
-    return FactorialBot(mock_page, dry_run=True)
+    return FactorialBot(mock_page, dry_run=True, limiter=unthrottled_limiter())
 
 
 async def test_process_attendance_skips_weekend(dry_run_bot, mock_page):
@@ -227,3 +250,123 @@ async def test_process_attendance_fills_normal_day(
 
     toggle_button_mock.click.assert_awaited_once()
     mock_fill_hours.assert_awaited_once_with(start_date, None, mock_row)
+
+
+@patch("src.bot.FactorialBot._fill_hours_for_day", new_callable=AsyncMock)
+async def test_process_attendance_reconciles_month_in_one_snapshot(
+    mock_fill_hours, bot, mock_page
+):
+    """
+    Tests that after writing, the month is verified with a single read of all rows.
+    """
+    start_date = datetime(2025, 10, 13)  # Monday
+    end_date = datetime(2025, 10, 14)  # Tuesday
+    monday, tuesday = MagicMock(), MagicMock()
+    monday.text_content = AsyncMock(return_value="13 Oct 0h 00m")
+    tuesday.text_content = AsyncMock(return_value="14 Oct 0h 00m")
+    monday.locator.return_value = AsyncMock()
+    tuesday.locator.return_value = AsyncMock()
+
+    rows_locator = MagicMock()
+    rows_locator.count = AsyncMock(return_value=2)
+    rows_locator.nth.side_effect = lambda i: [monday, tuesday][i]
+    rows_locator.all_text_contents = AsyncMock(
+        return_value=["13 Oct 8h 30m", "14 Oct 0h 00m"]
+    )
+    mock_page.locator.return_value = rows_locator
+
+    report = await bot.process_attendance(start_date, end_date, absences={})
+
+    rows_locator.all_text_contents.assert_awaited_once()
+    assert [(e["date"], e["status"]) for e in report.entries] == [
+        ("2025-10-13", "ok"),
+        ("2025-10-14", "retry"),
+    ]
+
+
+async def test_fill_hours_captures_artifact_when_row_cannot_expand(mock_page):
+    """
+    Tests that a day that cannot be filled leaves a failure artifact behind.
+    """
+    artifacts = MagicMock()
+    artifacts.capture = AsyncMock()
+    bot = FactorialBot(
+        mock_page, dry_run=False, artifacts=artifacts, limiter=unthrottled_limiter()
+    )
+    target_row = MagicMock()
+    target_row.locator.return_value.click = AsyncMock(side_effect=Exception("detached"))
+
+    filled = await bot._fill_hours_for_day(datetime(2025, 10, 13), None, target_row)
+
+    assert filled is False
+    artifacts.capture.assert_awaited_once_with(mock_page, "expand-2025-10-13")
+
+
+async def test_process_attendance_captures_artifact_when_row_is_missing(mock_page):
+    """
+    Tests that a day whose row cannot be found leaves a failure artifact behind.
+    """
+    artifacts = MagicMock()
+    artifacts.capture = AsyncMock()
+    bot = FactorialBot(
+        mock_page, dry_run=True, artifacts=artifacts, limiter=unthrottled_limiter()
+    )
+    rows_locator = MagicMock()
+    rows_locator.count = AsyncMock(return_value=0)
+    rows_locator.all_text_contents = AsyncMock(return_value=[])
+    mock_page.locator.return_value = rows_locator
+
+    date = datetime(2025, 10, 13)
+    await bot.process_attendance(date, date, absences={})
+
+    artifacts.capture.assert_awaited_once_with(mock_page, "row-2025-10-13")
+
+
+@patch("src.bot.FactorialBot._fill_hours_for_day", new_callable=AsyncMock)
+async def test_process_attendance_skips_day_filled_since_load(
+    mock_fill_hours, bot, mock_page
+):
+    """
+    Tests that the month is re-checked on a fresh copy before its first write.
+    """
+    date = datetime(2025, 10, 13)
+    mock_row = MagicMock()
+    # Empty when the month is first read, filled by another run on the reload
+    mock_row.text_content = AsyncMock(
+        side_effect=["13 Oct 0h 00m"] * 2 + ["13 Oct 8h 30m"] * 2
+    )
+    rows_locator = MagicMock()
+    rows_locator.count = AsyncMock(return_value=1)
+    rows_locator.nth.return_value = mock_row
+    rows_locator.all_text_contents = AsyncMock(return_value=["13 Oct 8h 30m"])
+    mock_page.locator.return_value = rows_locator
+
+    await bot.process_attendance(date, date, absences={})
+
+    assert mock_page.goto.await_count == 2
+    mock_fill_hours.assert_not_called()
+    assert bot.metrics.days["skipped"] == 1
+
+
+def test_configured_holidays_are_full_day_absences(mock_page, tmp_path):
+    """
+    Tests that holidays from config.toml are skipped like calendar absences.
+    """
+    config = tmp_path / "config.toml"
+    config.write_text('[schedule]\nholidays = ["2025-10-14"]\n')
+    bot = FactorialBot(
+        mock_page,
+        schedule=get_schedule(path=str(config)),
+        limiter=unthrottled_limiter(),
+    )
+    absences = {"2025-10-13": {"type": "half_morning", "reason": "vacation"}}
+
+    bot._add_configured_holidays(
+        absences, datetime(2025, 10, 13), datetime(2025, 10, 15)
+    )
+
+    assert absences == {
+        "2025-10-13": {"type": "half_morning", "reason": "vacation"},
+        "2025-10-14": {"type": "full", "reason": "holiday"},
+    }
+    assert bot._expected_minutes(datetime(2025, 10, 14), absences) == 0
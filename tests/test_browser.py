@@ -0,0 +1,75 @@
+import subprocess
+import pytest
+from src.browser import LaunchProfile, load_launch_profile, process_tree_rss_bytes
+
+
+def test_default_profile_uses_plain_headless_launch():
+    profile = LaunchProfile("default")
+    assert profile.launch_options() == {"headless": True}
+    assert profile.context_options() == {}
+
+
+def test_lean_profile_is_built_in():
+    """Tests the lean profile's launch and context options."""
+    profile = load_launch_profile("lean")
+    options = profile.launch_options()
+    assert options["channel"] == "chromium-headless-shell"
+    assert "--disable-background-networking" in options["args"]
+    assert profile.context_options() == {"viewport": {"width": 1024, "height": 700}}
+
+
+def test_profiles_can_be_defined_in_config(tmp_path, monkeypatch):
+    """Tests that config.toml can add profiles and pick the default one."""
+    (tmp_path / "config.toml").write_text(
+        '[browser]\nprofile = "tiny"\n\n'
+        '[browser.profiles.tiny]\nargs = ["--disable-gpu"]\n'
+        "viewport = { width = 800, height = 600 }\n"
+    )
+    monkeypatch.chdir(tmp_path)
+
+    profile = load_launch_profile()
+
+    assert profile.name == "tiny"
+    assert profile.launch_options() == {"headless": True, "args": ["--disable-gpu"]}
+
+
+def test_engine_overrides_profile_and_drops_chromium_args():
+    """Tests that a non-Chromium engine keeps the profile's viewport but not its switches."""
+    profile = load_launch_profile("lean", engine="firefox")
+
+    assert profile.browser_type == "firefox"
+    assert profile.launch_options() == {"headless": True}
+    assert profile.context_options() == {"viewport": {"width": 1024, "height": 700}}
+
+
+def test_unknown_engine_raises():
+    with pytest.raises(ValueError, match="Unknown browser engine"):
+        LaunchProfile("default", engine="netscape")
+
+
+def test_unknown_profile_raises():
+    with pytest.raises(ValueError, match="Unknown browser profile"):
+        load_launch_profile("missing")
+
+
+def test_unknown_profile_option_raises(tmp_path, monkeypatch):
+    """Tests that a misspelt profile key is reported by name."""
+    (tmp_path / "config.toml").write_text('[browser.profiles.tiny]\nheadles = false\n')
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(ValueError, match=r"\[browser.profiles.tiny\].*headles"):
+        load_launch_profile("tiny")
+
+
+def test_process_tree_rss_counts_child_processes():
+    """Tests that memory of spawned processes is attributed to the tree."""
+    baseline = process_tree_rss_bytes()
+    if baseline is None:
+        pytest.skip("/proc is not available")
+
+    child = subprocess.Popen(["sleep", "5"])
+    try:
+        assert process_tree_rss_bytes() > baseline
+    finally:
+        child.kill()
+        child.wait()
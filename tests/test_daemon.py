@@ -0,0 +1,159 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, AsyncMock, patch
+from src.constants import URL_DASHBOARD, URL_LOGIN
+from src.daemon import Daemon, ScheduledAccount
+from src.session_store import SessionStore
+
+# Mark all tests in this module as asyncio
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def account():
+    return ScheduledAccount(
+        name="alice",
+        days=["mon", "wed"],
+        time="19:00",
+        execute=True,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    store.save("alice", {"cookies": [], "origins": []})
+    return store
+
+
+@pytest.fixture
+def daemon(account, store):
+    """Provides a Daemon with a mock browser and context."""
+    daemon = Daemon([account], store=store)
+    daemon.locks = {account.name: asyncio.Lock()}
+    context = MagicMock()
+    page = MagicMock(close=AsyncMock(), url=URL_DASHBOARD)
+    context.new_page = AsyncMock(return_value=page)
+    context.storage_state = AsyncMock(return_value={"cookies": [], "origins": ["x"]})
+    context.close = AsyncMock()
+    daemon.contexts[account.name] = context
+    daemon.context_sessions[account.name] = store.refreshed_at(account.name)
+    daemon.browser = MagicMock()
+    daemon.browser.is_connected.return_value = True
+    return daemon
+
+
+def test_next_run_same_day(account):
+    """Tests that a run later today is scheduled for today."""
+    now = datetime(2025, 10, 13, 9, 0)  # A Monday
+    assert account.next_run(now) == datetime(2025, 10, 13, 19, 0)
+
+
+def test_next_run_skips_to_next_scheduled_weekday(account):
+    """Tests that a missed slot moves to the next configured weekday."""
+    now = datetime(2025, 10, 13, 19, 0)  # Monday, exactly at run time
+    assert account.next_run(now) == datetime(2025, 10, 15, 19, 0)
+
+
+@patch("src.daemon.FactorialBot")
+async def test_run_account_reuses_warm_context(MockFactorialBot, daemon, account):
+    """Tests that a run uses the account's existing context and saves its session."""
+    MockFactorialBot.return_value.run = AsyncMock()
+    context = daemon.contexts[account.name]
+
+    await daemon.run_account(account)
+
+    assert MockFactorialBot.call_args.kwargs["dry_run"] is False
+    context.storage_state.assert_awaited_once()
+    assert daemon.store.load("alice")["origins"] == ["x"]
+    assert daemon.status["alice"]["last_result"] == "ok"
+    assert daemon.status["alice"]["state"] == "idle"
+
+
+@patch("src.daemon.FactorialBot")
+async def test_run_account_failure_drops_context(MockFactorialBot, daemon, account):
+    """Tests that a failed run is reported and its context discarded."""
+    MockFactorialBot.return_value.run = AsyncMock(side_effect=Exception("boom"))
+
+    await daemon.run_account(account)
+
+    assert daemon.status["alice"]["last_result"] == "error: boom"
+    assert account.name not in daemon.contexts
+
+
+@patch("src.daemon.FactorialBot")
+async def test_run_on_expired_session_fails_without_saving(
+    MockFactorialBot, daemon, account
+):
+    """Tests that a run that ends on the login page fails and keeps the stored cookies."""
+    MockFactorialBot.return_value.run = AsyncMock()
+    daemon.contexts[account.name].new_page.return_value.url = URL_LOGIN
+
+    await daemon.run_account(account)
+
+    assert daemon.status["alice"]["last_result"].startswith("error: session expired")
+    assert daemon.status["alice"]["session"] == "needs_login"
+    assert daemon.store.load("alice")["origins"] == []
+    assert account.name not in daemon.contexts
+
+
+@patch("src.daemon.new_context")
+@patch("src.daemon.FactorialBot")
+async def test_run_picks_up_session_saved_elsewhere(
+    MockFactorialBot, mock_new_context, daemon, account
+):
+    """Tests that a newer stored session replaces the warm context, not the reverse."""
+    MockFactorialBot.return_value.run = AsyncMock()
+    stale = daemon.contexts[account.name]
+    fresh = MagicMock(close=AsyncMock())
+    fresh.new_page = AsyncMock(
+        return_value=MagicMock(close=AsyncMock(), url=URL_DASHBOARD)
+    )
+    fresh.storage_state = AsyncMock(return_value={"cookies": [], "origins": ["fresh"]})
+    mock_new_context.return_value = fresh
+    # e.g. main.py --force-login
+    daemon.store.save("alice", {"cookies": [], "origins": ["login"]})
+
+    await daemon.run_account(account)
+
+    stale.close.assert_awaited_once()
+    assert mock_new_context.call_args.kwargs["storage_state"]["origins"] == ["login"]
+    assert daemon.store.load("alice")["origins"] == ["fresh"]
+    assert daemon.status["alice"]["last_result"] == "ok"
+
+
+@patch("src.daemon.Navigator")
+async def test_expired_session_is_not_refreshed_until_login(
+    MockNavigator, daemon, account
+):
+    """Tests that refreshes skip an expired session until a new one is saved."""
+    MockNavigator.return_value.goto = AsyncMock()
+    page = daemon.contexts[account.name].new_page.return_value
+    page.url = URL_LOGIN
+    await daemon.refresh_session(account)
+    assert daemon.status["alice"]["session"] == "needs_login"
+    assert daemon._awaiting_login("alice")
+
+    daemon.store.save("alice", {"cookies": [], "origins": ["new"]})
+    assert not daemon._awaiting_login("alice")
+
+
+async def test_status_endpoint(daemon):
+    """Tests that the HTTP endpoint serves the daemon status as JSON."""
+    server = await asyncio.start_server(daemon._handle_http, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /status HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    head, body = response.split(b"\r\n\r\n", 1)
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    assert json.loads(body)["accounts"]["alice"]["state"] == "idle"
@@ -0,0 +1,52 @@
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, AsyncMock
+from src.har import (
+    har_path,
+    load_recorded_date,
+    route_from_har,
+    save_recorded_date,
+)
+
+# Mark all tests in this module as asyncio
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def context():
+    context = MagicMock()
+    context.route_from_har = AsyncMock()
+    return context
+
+
+async def test_record_updates_har(context, tmp_path):
+    """Tests that record mode writes the HAR when the context closes."""
+    await route_from_har(context, "record", "alice", "bot", har_dir=str(tmp_path))
+    context.route_from_har.assert_awaited_once_with(
+        har_path("alice", "bot", str(tmp_path)), update=True, update_content="embed"
+    )
+
+
+async def test_replay_aborts_unrecorded_requests(context, tmp_path):
+    """Tests that replay never falls through to the live site."""
+    path = tmp_path / "alice-bot.har"
+    path.write_text("{}")
+    await route_from_har(context, "replay", "alice", "bot", har_dir=str(tmp_path))
+    context.route_from_har.assert_awaited_once_with(str(path), not_found="abort")
+
+
+async def test_replay_without_recording_fails(context, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        await route_from_har(context, "replay", "alice", "bot", har_dir=str(tmp_path))
+
+
+async def test_no_mode_leaves_context_untouched(context):
+    await route_from_har(context, None, "alice", "bot")
+    context.route_from_har.assert_not_awaited()
+
+
+def test_recorded_date_round_trip(tmp_path):
+    """Tests that a replay reuses the date range of its recording."""
+    recorded = datetime(2025, 10, 20, 19, 0)
+    save_recorded_date("alice", recorded, har_dir=str(tmp_path))
+    assert load_recorded_date("alice", har_dir=str(tmp_path)) == recorded
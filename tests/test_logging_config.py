@@ -0,0 +1,74 @@
+import json
+import logging
+from src.logging_config import (
+    ContextFilter,
+    JsonFormatter,
+    account_context,
+    date_context,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+def make_record(msg, *args, level=logging.INFO):
+    record = logging.LogRecord("src.bot", level, __file__, 1, msg, args, None)
+    ContextFilter().filter(record)
+    return record
+
+
+def test_json_formatter_includes_context_fields():
+    """Tests that account and date context variables end up in JSON lines."""
+    account_token = account_context.set("alice")
+    date_token = date_context.set("2025-10-13")
+    try:
+        record = make_record("Processing %s...", "2025-10-13")
+    finally:
+        date_context.reset(date_token)
+        account_context.reset(account_token)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["msg"] == "Processing 2025-10-13..."
+    assert entry["level"] == "info"
+    assert entry["logger"] == "src.bot"
+    assert entry["account"] == "alice"
+    assert entry["date"] == "2025-10-13"
+
+
+def test_json_formatter_omits_missing_context():
+    entry = json.loads(JsonFormatter().format(make_record("Detecting absences...")))
+    assert "account" not in entry and "date" not in entry
+
+
+def test_queue_logging_writes_json_lines(capsys):
+    """Tests that records go through the queue listener to stdout."""
+    setup_logging(level="DEBUG", json_output=True)
+    try:
+        logging.getLogger("src.navigator").debug("Navigating to %s", "https://x")
+    finally:
+        shutdown_logging()
+
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert json.loads(lines[-1])["msg"] == "Navigating to https://x"
+
+
+def test_debug_messages_are_not_formatted_when_disabled():
+    """Tests that verbose per-call logs are dropped before any formatting work."""
+    setup_logging(level="INFO")
+    try:
+        logger = logging.getLogger("src.navigator")
+        assert not logger.isEnabledFor(logging.DEBUG)
+    finally:
+        shutdown_logging()
+
+
+def test_shutdown_detaches_queue_handler():
+    """Tests that no handler is left feeding a queue nobody drains."""
+    root = logging.getLogger()
+    before = list(root.handlers)
+    setup_logging(level="INFO")
+    setup_logging(level="DEBUG")
+    assert len(root.handlers) == len(before) + 1
+
+    shutdown_logging()
+    assert root.handlers == before
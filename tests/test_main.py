@@ -1,5 +1,6 @@
 import pytest
-from unittest.mock import patch, AsyncMock
+from datetime import datetime
+from unittest.mock import patch, AsyncMock, ANY
 
 # Because main.py is a script, we import it in a way that we can patch it
 from src import main as main_script
@@ -8,6 +9,12 @@ from src import main as main_script
 pytestmark = pytest.mark.anyio
 
 
+@pytest.fixture(autouse=True)
+def run_in_tmp_path(tmp_path, monkeypatch):
+    """Keeps files written by a run (e.g. metrics) out of the repository."""
+    monkeypatch.chdir(tmp_path)
+
+
 @patch("src.main.FactorialBot")
 @patch("src.main.Authenticator")
 @patch("src.main.async_playwright")
@@ -22,7 +29,7 @@ async def test_main_default_dry_run(
 
     # Setup mocks
     mock_auth_instance = MockAuthenticator.return_value
-    mock_auth_instance.authenticate = AsyncMock(return_value="fake_auth_file")
+    mock_auth_instance.authenticate = AsyncMock(return_value={"cookies": []})
 
     mock_bot_instance = MockFactorialBot.return_value
     mock_bot_instance.run = AsyncMock()
@@ -30,7 +37,14 @@ async def test_main_default_dry_run(
     await main_script.main_async()
 
     # Assert Authenticator was called correctly
-    MockAuthenticator.assert_called_once_with(force_login=False)
+    MockAuthenticator.assert_called_once_with(
+        force_login=False,
+        account="default",
+        har_mode=None,
+        store=ANY,
+        profile=ANY,
+        artifacts=ANY,
+    )
     mock_auth_instance.authenticate.assert_awaited_once()
 
     # Assert FactorialBot was called with dry_run=True
@@ -51,7 +65,7 @@ async def test_main_with_execute_flag(
     monkeypatch.setattr(main_script.sys, "argv", ["src/main.py", "--execute"])
 
     mock_auth_instance = MockAuthenticator.return_value
-    mock_auth_instance.authenticate = AsyncMock(return_value="fake_auth_file")
+    mock_auth_instance.authenticate = AsyncMock(return_value={"cookies": []})
 
     # FIX: The mocked bot instance needs an async 'run' method
     mock_bot_instance = MockFactorialBot.return_value
@@ -76,7 +90,7 @@ async def test_main_with_force_login_flag(
     monkeypatch.setattr(main_script.sys, "argv", ["src/main.py", "--force-login"])
 
     mock_auth_instance = MockAuthenticator.return_value
-    mock_auth_instance.authenticate = AsyncMock(return_value="fake_auth_file")
+    mock_auth_instance.authenticate = AsyncMock(return_value={"cookies": []})
 
     # FIX: The mocked bot instance needs an async 'run' method
     mock_bot_instance = MockFactorialBot.return_value
@@ -85,12 +99,18 @@ async def test_main_with_force_login_flag(
     await main_script.main_async()
 
     # Assert Authenticator was initialized with force_login=True
-    MockAuthenticator.assert_called_once_with(force_login=True)
+    MockAuthenticator.assert_called_once_with(
+        force_login=True,
+        account="default",
+        har_mode=None,
+        store=ANY,
+        profile=ANY,
+        artifacts=ANY,
+    )
 
 
 @patch("src.main.Authenticator")
-@patch("builtins.print")
-async def test_main_authentication_failure(mock_print, MockAuthenticator, monkeypatch):
+async def test_main_authentication_failure(MockAuthenticator, monkeypatch, caplog):
     """
     Tests that the script exits if authentication fails.
     """
@@ -106,5 +126,192 @@ async def test_main_authentication_failure(mock_print, MockAuthenticator, monkey
     # Assert that the script tried to exit
     assert e.type == SystemExit
     assert e.value.code == 1
-    # Assert that a relevant error message was printed
-    mock_print.assert_any_call("Authentication failed: Test Auth Error")
+    # Assert that a relevant error message was logged
+    assert "Authentication failed: Test Auth Error" in caplog.messages
+
+
+@patch("src.main.FactorialBot")
+@patch("src.main.Authenticator")
+@patch("src.main.async_playwright")
+async def test_main_with_account_flag(
+    mock_playwright, MockAuthenticator, MockFactorialBot, monkeypatch
+):
+    """
+    Tests that the --account flag selects the stored session to use.
+    """
+    monkeypatch.setattr(main_script.sys, "argv", ["src/main.py", "--account", "bob"])
+
+    mock_auth_instance = MockAuthenticator.return_value
+    mock_auth_instance.authenticate = AsyncMock(return_value={"cookies": []})
+
+    mock_bot_instance = MockFactorialBot.return_value
+    mock_bot_instance.run = AsyncMock()
+
+    await main_script.main_async()
+
+    MockAuthenticator.assert_called_once_with(
+        force_login=False,
+        account="bob",
+        har_mode=None,
+        store=ANY,
+        profile=ANY,
+        artifacts=ANY,
+    )
+
+
+@patch("src.main.route_from_har", new_callable=AsyncMock)
+@patch("src.main.load_recorded_date")
+@patch("src.main.FactorialBot")
+@patch("src.main.Authenticator")
+@patch("src.main.async_playwright")
+async def test_main_with_replay_flag(
+    mock_playwright,
+    MockAuthenticator,
+    MockFactorialBot,
+    mock_load_recorded_date,
+    mock_route_from_har,
+    monkeypatch,
+    tmp_path,
+):
+    """
+    Tests that --replay runs offline on the recorded date's range.
+    """
+    monkeypatch.setattr(main_script.sys, "argv", ["src/main.py", "--replay"])
+    recorded = datetime(2025, 10, 20, 19, 0)
+    mock_load_recorded_date.return_value = recorded
+
+    mock_auth_instance = MockAuthenticator.return_value
+    mock_auth_instance.authenticate = AsyncMock(return_value={"cookies": []})
+
+    mock_bot_instance = MockFactorialBot.return_value
+    mock_bot_instance.run = AsyncMock()
+
+    await main_script.main_async()
+
+    assert MockAuthenticator.call_args.kwargs["har_mode"] == "replay"
+    assert mock_route_from_har.await_args.args[1:] == ("replay", "default", "bot")
+    assert MockFactorialBot.call_args.kwargs["offline"] is True
+    mock_bot_instance.run.assert_awaited_once_with(today=recorded)
+    # Replay timings stay out of the live metrics
+    assert not (tmp_path / "data" / "metrics").exists()
+
+
+@patch("src.main.Authenticator")
+async def test_main_rejects_replay_with_execute(MockAuthenticator, monkeypatch):
+    """
+    Tests that a replay can only be a dry run.
+    """
+    monkeypatch.setattr(
+        main_script.sys, "argv", ["src/main.py", "--replay", "--execute"]
+    )
+
+    with pytest.raises(SystemExit):
+        await main_script.main_async()
+
+    MockAuthenticator.assert_not_called()
+
+
+@patch("src.main.FactorialBot")
+@patch("src.main.Authenticator")
+@patch("src.main.async_playwright")
+async def test_main_writes_metrics_textfile(
+    mock_playwright, MockAuthenticator, MockFactorialBot, monkeypatch, tmp_path
+):
+    """
+    Tests that a successful run exports its metrics for the account.
+    """
+    monkeypatch.setattr(main_script.sys, "argv", ["src/main.py", "--account", "bob"])
+
+    mock_auth_instance = MockAuthenticator.return_value
+    mock_auth_instance.authenticate = AsyncMock(return_value={"cookies": []})
+
+    mock_bot_instance = MockFactorialBot.return_value
+    mock_bot_instance.run = AsyncMock()
+
+    await main_script.main_async()
+
+    metrics = MockFactorialBot.call_args.kwargs["metrics"]
+    assert metrics.account == "bob"
+    textfile = (tmp_path / "data" / "metrics" / "fucktorial-bob.prom").read_text()
+    assert 'fucktorial_run_success{account="bob",profile="default",engine="chromium"} 1' in textfile
+    assert "fucktorial_browser_launch_seconds" in textfile
+
+
+@patch("src.main.FactorialBot")
+@patch("src.main.Authenticator")
+@patch("src.main.async_playwright")
+async def test_main_with_profile_flag(
+    mock_playwright, MockAuthenticator, MockFactorialBot, monkeypatch
+):
+    """
+    Tests that --profile selects the launch options for both browsers.
+    """
+    monkeypatch.setattr(main_script.sys, "argv", ["src/main.py", "--profile", "lean"])
+
+    mock_auth_instance = MockAuthenticator.return_value
+    mock_auth_instance.authenticate = AsyncMock(return_value={"cookies": []})
+
+    mock_bot_instance = MockFactorialBot.return_value
+    mock_bot_instance.run = AsyncMock()
+
+    await main_script.main_async()
+
+    assert MockAuthenticator.call_args.kwargs["profile"].name == "lean"
+    playwright = mock_playwright.return_value.__aenter__.return_value
+    launch_kwargs = playwright.chromium.launch.await_args.kwargs
+    assert launch_kwargs["channel"] == "chromium-headless-shell"
+    assert "--disable-gpu" in launch_kwargs["args"]
+
+
+@patch("src.main.FactorialBot")
+@patch("src.main.Authenticator")
+@patch("src.main.async_playwright")
+async def test_main_with_engine_flag(
+    mock_playwright, MockAuthenticator, MockFactorialBot, monkeypatch
+):
+    """
+    Tests that --engine launches both browsers with the chosen engine.
+    """
+    monkeypatch.setattr(main_script.sys, "argv", ["src/main.py", "--engine", "webkit"])
+
+    mock_auth_instance = MockAuthenticator.return_value
+    mock_auth_instance.authenticate = AsyncMock(return_value={"cookies": []})
+
+    mock_bot_instance = MockFactorialBot.return_value
+    mock_bot_instance.run = AsyncMock()
+
+    await main_script.main_async()
+
+    assert MockAuthenticator.call_args.kwargs["profile"].engine == "webkit"
+    playwright = mock_playwright.return_value.__aenter__.return_value
+    playwright.webkit.launch.assert_awaited_once_with(headless=True)
+    playwright.chromium.launch.assert_not_called()
+
+
+@patch("src.main.Authenticator")
+async def test_main_with_unknown_profile(MockAuthenticator, monkeypatch):
+    """
+    Tests that an unknown profile stops the run before authenticating.
+    """
+    monkeypatch.setattr(main_script.sys, "argv", ["src/main.py", "--profile", "nope"])
+
+    with pytest.raises(SystemExit):
+        await main_script.main_async()
+
+    MockAuthenticator.assert_not_called()
+
+
+@patch("src.main.Authenticator")
+async def test_main_exits_when_account_run_is_in_progress(
+    MockAuthenticator, monkeypatch
+):
+    """
+    Tests that an executing run stops before authenticating if another one holds the lock.
+    """
+    monkeypatch.setattr(main_script.sys, "argv", ["src/main.py", "--execute"])
+
+    async with main_script.SessionStore().run_lock("default"):
+        with pytest.raises(SystemExit):
+            await main_script.main_async()
+
+    MockAuthenticator.assert_not_called()
@@ -0,0 +1,37 @@
+from src.metrics import RunMetrics
+
+
+def test_render_textfile_format():
+    """Tests the exposition format with per-account labels."""
+    metrics = RunMetrics(account="alice")
+    metrics.inc("navigations")
+    metrics.inc("navigations")
+    metrics.set("absences_detected", 3)
+    metrics.day("filled")
+    metrics.day("skipped")
+    with metrics.phase("attendance"):
+        pass
+
+    text = metrics.render()
+
+    assert "# TYPE fucktorial_navigations gauge" in text
+    assert 'fucktorial_navigations{account="alice"} 2' in text
+    assert 'fucktorial_absences_detected{account="alice"} 3' in text
+    assert 'fucktorial_days{account="alice",outcome="filled"} 1' in text
+    assert 'fucktorial_days{account="alice",outcome="failed"} 0' in text
+    assert 'fucktorial_phase_duration_seconds{account="alice",phase="attendance"}' in text
+    assert 'fucktorial_run_success{account="alice"} 0' in text
+    assert "browser_launch_seconds" not in text
+
+
+def test_write_textfile(tmp_path):
+    """Tests that metrics land in a per-account .prom file."""
+    metrics = RunMetrics(account="bob")
+    metrics.success = True
+
+    path = metrics.write_textfile(str(tmp_path / "metrics"))
+
+    assert path.endswith("fucktorial-bob.prom")
+    with open(path) as f:
+        assert 'fucktorial_run_success{account="bob"} 1' in f.read()
+    assert [p.name for p in (tmp_path / "metrics").iterdir()] == ["fucktorial-bob.prom"]
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock, AsyncMock
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from src.navigator import Navigator
+from src.rate_limiter import RateLimiter
 
 # Mark all tests in this module as asyncio
 pytestmark = pytest.mark.anyio
@@ -82,3 +83,39 @@ async def test_is_visible(navigator, mock_page):
     result = await navigator.is_visible(selector)
     mock_page.is_visible.assert_awaited_with(selector)
     assert result is True
+
+
+async def test_goto_retries_when_throttled(mock_page):
+    """Tests that goto backs off and retries a throttled navigation."""
+    limiter = RateLimiter(
+        tenant="test",
+        requests_per_second=1000.0,
+        burst=10,
+        max_retries=2,
+        backoff_base=0.0,
+        backoff_max=0.0,
+        retry_statuses=[429],
+        api_patterns=[],
+    )
+    throttled, ok = MagicMock(status=429, headers={}), MagicMock(status=200)
+    mock_page.goto = AsyncMock(side_effect=[throttled, ok])
+    navigator = Navigator(mock_page, limiter=limiter)
+
+    assert await navigator.goto("https://example.com") is ok
+    assert mock_page.goto.await_count == 2
+
+
+async def test_waits_count_timeouts(navigator, mock_page):
+    """Tests that every kind of wait records its timeouts in the run metrics."""
+    mock_page.wait_for_selector.side_effect = PlaywrightTimeoutError("test timeout")
+    locator = MagicMock(wait_for=AsyncMock(side_effect=PlaywrightTimeoutError("t")))
+    selectors = MagicMock(resolve=AsyncMock(side_effect=PlaywrightTimeoutError("t")))
+
+    with pytest.raises(PlaywrightTimeoutError):
+        await navigator.wait_for_selector("#modal")
+    with pytest.raises(PlaywrightTimeoutError):
+        await navigator.wait_for_locator(locator)
+    with pytest.raises(PlaywrightTimeoutError):
+        await navigator.resolve(selectors, "calendar")
+
+    assert navigator.metrics.values["timeouts"] == 3
@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from src.rate_limiter import (
+    DEFAULT_RATE_LIMIT,
+    RateLimiter,
+    ThrottledError,
+    TokenBucket,
+)
+
+# Mark all tests in this module as asyncio
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def limiter():
+    """Provides a limiter with a generous bucket and no real backoff sleeps."""
+    return RateLimiter(
+        tenant="test",
+        requests_per_second=1000.0,
+        burst=10,
+        max_retries=2,
+        backoff_base=0.0,
+        backoff_max=0.0,
+        retry_statuses=[429],
+        api_patterns=[],
+    )
+
+
+def response_with_status(status, headers=None):
+    response = MagicMock()
+    response.status = status
+    response.headers = headers or {}
+    return response
+
+
+def test_token_bucket_reserves_future_slots():
+    """Tests that an empty bucket hands out increasing delays."""
+    bucket = TokenBucket(rate=2.0, burst=1)
+    assert bucket._reserve() == 0.0
+    assert bucket._reserve() == pytest.approx(0.5, abs=0.01)
+    assert bucket._reserve() == pytest.approx(1.0, abs=0.01)
+
+
+def test_for_tenant_shares_one_limiter_per_tenant():
+    """Tests that Navigators on the same tenant share the same limiter."""
+    assert RateLimiter.for_tenant("acme") is RateLimiter.for_tenant("acme")
+    assert RateLimiter.for_tenant("acme") is not RateLimiter.for_tenant("globex")
+
+
+def test_for_tenant_reads_config_once(monkeypatch):
+    """Tests that [rate_limit] is loaded once, not per Navigator."""
+    load = MagicMock(return_value={**DEFAULT_RATE_LIMIT, "tenant": "acme"})
+    monkeypatch.setattr("src.rate_limiter.load_config_section", load)
+
+    assert RateLimiter.for_tenant().tenant == "acme"
+    RateLimiter.for_tenant("globex")
+    assert load.call_count == 1
+
+
+async def test_request_retries_throttled_responses(limiter):
+    """Tests that 429 responses are retried until a normal response arrives."""
+    send = AsyncMock(
+        side_effect=[response_with_status(429), response_with_status(200)]
+    )
+    response = await limiter.request(send)
+    assert response.status == 200
+    assert send.await_count == 2
+
+
+async def test_request_gives_up_after_max_retries(limiter):
+    """Tests that a ThrottledError is raised once retries run out."""
+    send = AsyncMock(return_value=response_with_status(429))
+    with pytest.raises(ThrottledError) as excinfo:
+        await limiter.request(send)
+    assert excinfo.value.response.status == 429
+    assert send.await_count == 3
+
+
+async def test_request_does_not_retry_timeouts(limiter):
+    """Tests that a timeout is raised at once rather than resent."""
+    send = AsyncMock(side_effect=PlaywrightTimeoutError("slow"))
+    with pytest.raises(PlaywrightTimeoutError):
+        await limiter.request(send)
+    assert send.await_count == 1
+
+
+def test_throttle_honours_retry_after(limiter):
+    """Tests that Retry-After is used (capped by backoff_max) instead of jitter."""
+    limiter.backoff_max = 5.0
+    assert limiter.throttle(0, retry_after=2.0) == 2.0
+    assert limiter.throttle(0, retry_after=60.0) == 5.0
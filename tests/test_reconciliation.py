@@ -0,0 +1,45 @@
+import json
+from src.reconciliation import (
+    ReconciliationReport,
+    parse_month_totals,
+    shift_minutes,
+)
+
+
+def test_shift_minutes():
+    """Tests that shift durations are summed in minutes."""
+    assert shift_minutes([("08:30", "14:00"), ("15:00", "18:00")]) == 510
+    assert shift_minutes([]) == 0
+
+
+def test_parse_month_totals():
+    """Tests that day numbers and totals are read from row texts."""
+    rows = [
+        "Día Entrada Salida Total",
+        "13 lun. 8h 30m",
+        "14 mar. 0h 00m",
+        "18 sáb. ",
+    ]
+    assert parse_month_totals(rows) == {13: 510, 14: 0}
+
+
+def test_report_classifies_days(tmp_path):
+    """Tests the retry/manual classification and the written JSON report."""
+    report = ReconciliationReport()
+    report.add("2025-10-13", expected=510, actual=510)
+    report.add("2025-10-14", expected=510, actual=0)
+    report.add("2025-10-15", expected=510, actual=330)
+    report.add("2025-10-16", expected=510, actual=None)
+
+    statuses = [(e["date"], e["status"]) for e in report.needing_attention()]
+    assert statuses == [
+        ("2025-10-14", "retry"),
+        ("2025-10-15", "manual"),
+        ("2025-10-16", "manual"),
+    ]
+
+    path = tmp_path / "reports" / "reconciliation.json"
+    report.write(str(path))
+    written = json.loads(path.read_text())
+    assert written["summary"] == {"ok": 1, "retry": 1, "manual": 2}
+    assert written["days"][3]["reason"] == "row_missing"
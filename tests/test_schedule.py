@@ -0,0 +1,131 @@
+from datetime import date, datetime
+import pytest
+from src.schedule import get_schedule, load_schedules
+
+LEGACY = """
+[schedule]
+normal_day_morning = ["08:30", "14:00"]
+normal_day_afternoon = ["15:00", "18:00"]
+friday_continuous = ["08:30", "15:00"]
+"""
+
+
+def write_config(tmp_path, text):
+    path = tmp_path / "config.toml"
+    path.write_text(text)
+    return str(path)
+
+
+def test_legacy_keys_compile_to_week(tmp_path):
+    schedule = get_schedule(path=write_config(tmp_path, LEGACY))
+
+    assert schedule.shifts_for(date(2025, 10, 13)) == (
+        ("08:30", "14:00"),
+        ("15:00", "18:00"),
+    )
+    assert schedule.shifts_for(datetime(2025, 10, 17, 9)) == (("08:30", "15:00"),)
+    assert schedule.shifts_for(date(2025, 10, 18)) == ()
+    assert not schedule.is_working_day(date(2025, 10, 19))
+
+
+def test_schedules_are_compiled_once_per_path(tmp_path):
+    path = write_config(tmp_path, LEGACY)
+
+    assert get_schedule("alice", path) is get_schedule(path=path)
+    assert load_schedules(path) is load_schedules(path)
+
+
+def test_schedules_are_cached_by_absolute_path(tmp_path, monkeypatch):
+    first, second = tmp_path / "a", tmp_path / "b"
+    first.mkdir()
+    second.mkdir()
+    write_config(first, LEGACY)
+    write_config(second, LEGACY.replace('"18:00"', '"19:00"'))
+
+    monkeypatch.chdir(first)
+    from_first = get_schedule(path="config.toml")
+    monkeypatch.chdir(second)
+    from_second = get_schedule(path="config.toml")
+
+    assert from_first is not from_second
+    assert from_second.shifts_for(date(2025, 10, 13))[1] == ("15:00", "19:00")
+
+
+def test_schedules_are_immutable(tmp_path):
+    schedule = get_schedule(path=write_config(tmp_path, LEGACY))
+
+    with pytest.raises(AttributeError):
+        schedule.holidays = frozenset()
+
+
+def test_weekday_and_date_range_overrides(tmp_path):
+    path = write_config(
+        tmp_path,
+        LEGACY
+        + """
+[schedule.weekdays]
+wed = [["08:00", "15:00"]]
+
+[[schedule.overrides]]
+start = "2025-07-01"
+end = 2025-08-31
+shifts = [["08:00", "15:00"]]
+""",
+    )
+    schedule = get_schedule(path=path)
+
+    assert schedule.shifts_for(date(2025, 10, 15)) == (("08:00", "15:00"),)
+    # Summer hours replace working days only
+    assert schedule.shifts_for(date(2025, 7, 7)) == (("08:00", "15:00"),)
+    assert schedule.shifts_for(date(2025, 7, 5)) == ()
+    assert len(schedule.shifts_for(date(2025, 9, 1))) == 2
+
+
+def test_account_overrides_and_holidays(tmp_path):
+    path = write_config(
+        tmp_path,
+        LEGACY
+        + """
+holidays = ["2025-12-24"]
+
+[schedule.accounts.alice]
+friday_continuous = ["08:00", "14:00"]
+holidays = ["2025-10-31"]
+""",
+    )
+
+    alice = get_schedule("alice", path)
+    shared = get_schedule("bob", path)
+
+    assert alice.shifts_for(date(2025, 10, 17)) == (("08:00", "14:00"),)
+    assert shared.shifts_for(date(2025, 10, 17)) == (("08:30", "15:00"),)
+    assert alice.is_holiday(date(2025, 10, 31)) and alice.is_holiday(date(2025, 12, 24))
+    assert not shared.is_holiday(date(2025, 10, 31))
+    assert alice.shifts_for(date(2025, 12, 24)) == ()
+    assert alice.is_working_day(date(2025, 12, 24))
+
+
+@pytest.mark.parametrize(
+    "extra, message",
+    [
+        ('[schedule.weekdays]\nfunday = []\n', "unknown weekday"),
+        ('[schedule.weekdays]\nmon = [["9:00", "14:00"]]\n', "HH:MM"),
+        ('[schedule.weekdays]\nmon = [["14:00", "09:00"]]\n', "ends before it starts"),
+        (
+            '[schedule.weekdays]\nmon = [["08:00", "14:00"], ["13:00", "18:00"]]\n',
+            "overlap",
+        ),
+        (
+            '[schedule.weekdays]\n'
+            'mon = [["08:00", "10:00"], ["11:00", "13:00"], ["14:00", "18:00"]]\n',
+            "at most 2 shifts",
+        ),
+        (
+            '[[schedule.overrides]]\nstart = "2025-08-31"\nend = "2025-07-01"\n',
+            "before start",
+        ),
+    ],
+)
+def test_invalid_schedule_raises(tmp_path, extra, message):
+    with pytest.raises(ValueError, match=message):
+        load_schedules(write_config(tmp_path, LEGACY + extra))
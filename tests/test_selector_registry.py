@@ -0,0 +1,112 @@
+import asyncio
+import json
+import re
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from src.constants import SELECTOR_FALLBACKS, SELECTOR_TIMEOFF_HOLIDAY_MARKERS
+from src.selector_registry import SelectorRegistry
+
+# Mark all tests in this module as asyncio
+pytestmark = pytest.mark.anyio
+
+STRATEGIES = {"calendar": ["ul.hashed", "role=list", "ul:has(li)"]}
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "selector_cache.json")
+
+
+def page_matching(*present):
+    """Provides a mock Page where only the given selectors resolve."""
+    page = MagicMock()
+
+    async def wait_for_selector(selector, state="attached", timeout=5000):
+        if selector not in present:
+            raise PlaywrightTimeoutError(f"{selector} not found")
+
+    page.wait_for_selector = AsyncMock(side_effect=wait_for_selector)
+    return page
+
+
+async def test_resolve_prefers_first_matching_strategy(cache_path):
+    """Tests that the earliest strategy wins when several match."""
+    registry = SelectorRegistry(STRATEGIES, cache_path=cache_path)
+    page = page_matching("role=list", "ul:has(li)")
+
+    assert await registry.resolve(page, "calendar") == "role=list"
+
+
+async def test_resolve_waits_for_preferred_strategy(cache_path):
+    """Tests that a faster fallback does not beat a slower preferred strategy."""
+    registry = SelectorRegistry(STRATEGIES, cache_path=cache_path)
+    latency = {"ul.hashed": 0.05, "role=list": 0.03, "ul:has(li)": 0.0}
+    missing = {"ul.hashed"}
+    page = MagicMock()
+
+    async def wait_for_selector(selector, state="attached", timeout=5000):
+        await asyncio.sleep(latency[selector])
+        if selector in missing:
+            raise PlaywrightTimeoutError(f"{selector} not found")
+
+    page.wait_for_selector = AsyncMock(side_effect=wait_for_selector)
+
+    assert await registry.resolve(page, "calendar") == "role=list"
+
+    missing.clear()
+    fresh = SelectorRegistry(STRATEGIES, cache_path=f"{cache_path}.fresh")
+    assert await fresh.resolve(page, "calendar") == "ul.hashed"
+
+
+async def test_resolve_persists_winning_strategy(cache_path):
+    """Tests that the winner is cached on disk and queried alone next time."""
+    registry = SelectorRegistry(STRATEGIES, cache_path=cache_path)
+    await registry.resolve(page_matching("ul:has(li)"), "calendar")
+
+    with open(cache_path) as f:
+        assert json.load(f) == {"calendar": "ul:has(li)"}
+
+    reloaded = SelectorRegistry(STRATEGIES, cache_path=cache_path)
+    page = page_matching("ul:has(li)")
+    assert await reloaded.resolve(page, "calendar") == "ul:has(li)"
+    page.wait_for_selector.assert_awaited_once_with(
+        "ul:has(li)", state="attached", timeout=5000
+    )
+
+
+async def test_resolve_falls_back_when_cached_strategy_is_stale(cache_path):
+    """Tests that a stale cached selector is replaced by a working fallback."""
+    with open(cache_path, "w") as f:
+        json.dump({"calendar": "ul.hashed"}, f)
+    registry = SelectorRegistry(STRATEGIES, cache_path=cache_path)
+
+    assert await registry.resolve(page_matching("role=list"), "calendar") == "role=list"
+    assert registry.get("calendar") == "role=list"
+
+
+async def test_resolve_raises_when_nothing_matches(cache_path):
+    """Tests that a timeout is raised once all strategies have failed."""
+    registry = SelectorRegistry(STRATEGIES, cache_path=cache_path)
+
+    with pytest.raises(PlaywrightTimeoutError):
+        await registry.resolve(page_matching(), "calendar")
+
+
+def test_unknown_cached_strategy_is_ignored(cache_path):
+    """Tests that cache entries no longer in the registry are discarded."""
+    with open(cache_path, "w") as f:
+        json.dump({"calendar": "div.removed"}, f)
+    registry = SelectorRegistry(STRATEGIES, cache_path=cache_path)
+
+    assert registry.get("calendar") == "ul.hashed"
+
+
+def test_fallbacks_survive_a_redeploy():
+    """Tests that every element can be found without a hashed class name."""
+    hashed = re.compile(r"\.[a-z0-9_]{6,}")  # e.g. .htyto3, ._19gth1z7h
+    for name, strategies in SELECTOR_FALLBACKS.items():
+        assert any(not hashed.search(s) for s in strategies), name
+    assert any(not hashed.search(m) for m in SELECTOR_TIMEOFF_HOLIDAY_MARKERS)
+    # Month headers can also be found by their visible text
+    assert any(":text" in s for s in SELECTOR_FALLBACKS["timeoff_month_name"])
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import time
+import pytest
+from src.session_store import RunLockError, SessionStore, session_expiry
+
+# Mark all tests in this module as asyncio
+pytestmark = pytest.mark.anyio
+
+
+def state_expiring_at(expires):
+    return {
+        "cookies": [
+            {"name": "_factorial_session", "domain": ".factorialhr.com", "expires": expires},
+            {"name": "_ga", "domain": ".factorialhr.com", "expires": expires - 3600},
+        ],
+        "origins": [],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Provides a SessionStore backed by a temporary database."""
+    return SessionStore(str(tmp_path / "sessions.db"))
+
+
+def test_save_and_load_round_trip(store):
+    """Tests that a storage state is stored per account."""
+    store.save("alice", state_expiring_at(2_000_000_000))
+    store.save("bob", {"cookies": [], "origins": []})
+
+    assert store.load("alice") == state_expiring_at(2_000_000_000)
+    assert store.load("bob") == {"cookies": [], "origins": []}
+    assert store.load("carol") is None
+
+
+def test_session_expiry_uses_session_cookie():
+    """Tests that only Factorial session cookies determine the expiry."""
+    assert session_expiry(state_expiring_at(2_000_000_000)) == 2_000_000_000
+    assert session_expiry({"cookies": []}) is None
+
+
+def test_needs_refresh_returns_sessions_expiring_soon(store):
+    """Tests the expiry index query for sessions that need refresh."""
+    now = time.time()
+    store.save("soon", state_expiring_at(now + 600))
+    store.save("later", state_expiring_at(now + 86400))
+    store.save("expired", state_expiring_at(now - 60))
+
+    assert store.needs_refresh(3600) == ["expired", "soon"]
+
+
+def test_import_file(store, tmp_path):
+    """Tests that a legacy auth.json is imported into the store."""
+    auth_file = tmp_path / "auth.json"
+    auth_file.write_text(json.dumps({"cookies": [], "origins": []}))
+
+    assert store.import_file("default", str(auth_file)) is not None
+    assert store.load("default") == {"cookies": [], "origins": []}
+    assert store.import_file("other", str(tmp_path / "missing.json")) is None
+
+
+async def test_lock_serialises_refreshes(store):
+    """Tests that two holders of the same account lock never overlap."""
+    events = []
+
+    async def refresh(name):
+        async with store.lock("alice"):
+            events.append(f"{name} start")
+            await asyncio.sleep(0.05)
+            events.append(f"{name} end")
+
+    await asyncio.gather(refresh("a"), refresh("b"))
+
+    assert events[0].split()[0] == events[1].split()[0]
+    assert events[2].split()[0] == events[3].split()[0]
+
+
+async def test_run_lock_rejects_overlapping_run(store):
+    """Tests that a second run for the same account fails fast instead of waiting."""
+    async with store.run_lock("alice"):
+        with pytest.raises(RunLockError, match="in progress"):
+            async with store.run_lock("alice"):
+                pass
+        # Other accounts are not affected
+        async with store.run_lock("bob"):
+            pass
+
+    async with store.run_lock("alice"):
+        pass
+
+
+async def test_lock_rejects_unsafe_account_names(store):
+    """Tests that an account name cannot point a lock file outside the lock dir."""
+    for account in ("../x", "a/b", ".hidden", ""):
+        with pytest.raises(ValueError, match="Invalid account name"):
+            async with store.run_lock(account):
+                pass
+    async with store.lock("bob.smith_2-x"):
+        pass